@@ -0,0 +1,198 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import repeat
+
+from RubikCompleto import METRICS, GeometricCooling, RubikCube, RubikSolver, validate_state
+
+# Nombre de algoritmo (los mismos que usa RubikTestTiempos) -> metodo de RubikSolver
+ALGORITHMS = {
+    "BFS": 'solve_bfs',
+    "Vectorized BFS": 'solve_vectorized_bfs',
+    "Bidirectional BFS": 'solve_bidirectional',
+    "Best-First Search": 'solve_best_first_search',
+    "A*": 'solve_a_star',
+    "Beam Search": 'solve_beam_search',
+    "IDA*": 'solve_ida_star',
+    "Two-Phase": 'solve_two_phase',
+    "Simulated Annealing": 'solve_simulated_annealing',
+    "Batch Annealing": 'solve_batch_annealing',
+}
+HEURISTIC_ALGORITHMS = {"Best-First Search", "A*", "Beam Search", "IDA*"}
+HEURISTICS = ['heuristic1', 'heuristic2', 'heuristic3', 'heuristic4', 'pattern']
+# Estado de los resultados de solve_batch cuya mezcla no es valida
+INVALID = 'invalid'
+
+# Estado de cada proceso trabajador, creado una vez por proceso en _init_worker
+_worker_solver = None
+_worker_heuristic = None
+
+
+def scramble_to_state(scramble):
+    # Acepta un RubikCube, un estado de 54 bytes o una secuencia de movimientos ("R U F'" o lista).
+    # Lanza ValueError si un movimiento no existe o el estado no es un cubo valido
+    if isinstance(scramble, RubikCube):
+        state = scramble.state
+    elif isinstance(scramble, (bytes, bytearray)):
+        state = bytes(scramble)
+    else:
+        cube = RubikCube()
+        for move in scramble.split() if isinstance(scramble, str) else scramble:
+            try:
+                cube.rotate(move)
+            except (KeyError, TypeError):
+                raise ValueError(f"unknown move {move!r}") from None
+        state = cube.state
+    validate_state(state)
+    return state
+
+
+def _init_worker(metric, algorithm, heuristic):
+    # Las tablas de solo lectura se cargan una vez por proceso; al estar mapeadas en
+    # memoria, todos los procesos comparten las mismas paginas fisicas
+    global _worker_solver, _worker_heuristic
+    _worker_solver = RubikSolver(metric)
+    if heuristic == 'pattern':
+        from RubikPDB import pattern_heuristic
+        _worker_heuristic = pattern_heuristic(metric)
+    elif heuristic is not None:
+        _worker_heuristic = getattr(_worker_solver, heuristic)
+    if algorithm == "Two-Phase":
+        from RubikKociemba import default_two_phase_solver
+        default_two_phase_solver()
+
+
+def _solve_one(index, state, algorithm, options):
+    solver = _worker_solver
+    solver.cube = RubikCube(state)
+    solve = getattr(solver, ALGORITHMS[algorithm])
+    start_time = time.perf_counter()
+    if algorithm in HEURISTIC_ALGORITHMS:
+        solution = solve(_worker_heuristic, **options)
+    else:
+        solution = solve(**options)
+    elapsed = time.perf_counter() - start_time
+    return {'index': index, 'solution': solution, 'status': solver.status, 'time': elapsed, 'worker': os.getpid()}
+
+
+def solve_batch(scrambles, algorithm, workers=None, heuristic=None, metric='HTM', max_pending=None, **options):
+    # Resuelve cubos independientes en un pool de procesos y devuelve los resultados a
+    # medida que terminan (no en el orden de entrada); 'index' indica a que mezcla corresponden.
+    # Una mezcla invalida no detiene el lote: su resultado tiene estado INVALID y 'error'
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm {algorithm!r}, expected one of {sorted(ALGORITHMS)}")
+    if algorithm in HEURISTIC_ALGORITHMS and heuristic is None:
+        raise ValueError(f"{algorithm} needs a heuristic, one of {HEURISTICS}")
+    if heuristic is not None and heuristic not in HEURISTICS:
+        raise ValueError(f"unknown heuristic {heuristic!r}, expected one of {HEURISTICS}")
+    if metric not in METRICS:
+        raise ValueError(f"unknown metric {metric!r}, expected one of {sorted(METRICS)}")
+    workers = workers or os.cpu_count()
+    # Limita las tareas pendientes para no convertir toda la entrada en futuros a la vez
+    max_pending = max_pending or 4 * workers
+    # Las tablas que falten se construyen aqui, una sola vez, antes de arrancar el pool: si no,
+    # cada trabajador construiria las mismas a la vez. Asi los trabajadores solo mapean archivos
+    if heuristic == 'pattern':
+        from RubikPDB import pattern_heuristic
+        pattern_heuristic(metric)
+    if algorithm == "Two-Phase":
+        from RubikKociemba import default_two_phase_solver
+        default_two_phase_solver()
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(metric, algorithm, heuristic)) as executor:
+        pending = set()
+        for index, scramble in enumerate(scrambles):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            try:
+                state = scramble_to_state(scramble)
+            except (TypeError, ValueError) as error:
+                yield {'index': index, 'solution': None, 'status': INVALID, 'error': str(error), 'time': 0.0,
+                       'worker': None}
+                continue
+            pending.add(executor.submit(_solve_one, index, state, algorithm, options))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _anneal_chain(metric, chain, steps):
+    # Avanza una cadena unos pasos; el estado del generador y el programa de temperatura
+    # viajan con la cadena
+    solver = RubikSolver(metric)
+    rng = random.Random()
+    rng.setstate(chain['rng'])
+    schedule = chain['schedule']
+    current_cube, energy, best_cube, best_energy = solver.anneal(
+        RubikCube(chain['state']), chain['energy'], RubikCube(chain['best_state']), chain['best_energy'],
+        schedule, steps, rng)
+    return {'state': current_cube.state, 'energy': energy, 'best_state': best_cube.state,
+            'best_energy': best_energy, 'schedule': schedule, 'rng': rng.getstate(), 'steps': solver.nodes_expanded}
+
+
+def parallel_annealing(cube, metric='HTM', chains=4, workers=None, seed=0, mode='restart', temp=30,
+                       cooling_rate=0.99, stop_temp=0.1, exchange_interval=100, temp_ratio=0.7, stats=None,
+                       budget=None, schedule=GeometricCooling):
+    # Varias cadenas de recocido en procesos distintos. La cadena k usa la semilla seed + k y
+    # los intercambios se deciden en este proceso, asi que el resultado es reproducible y no
+    # depende del numero de procesos. Cada exchange_interval pasos:
+    # - 'restart': la cadena con peor energia actual reinicia desde el mejor estado encontrado
+    # - 'tempering': las cadenas forman una escalera de temperaturas temp * temp_ratio^k y
+    #   las vecinas intercambian estados con el criterio de Metropolis
+    # Cada cadena tiene su programa de temperatura, schedule(temp, cooling_rate, stop_temp),
+    # que tiene que poder enviarse a otro proceso (una clase o un functools.partial)
+    # Termina en cuanto alguna cadena llega a energia 0, todas se enfrian o se agota el
+    # presupuesto (comprobado entre rondas). Las estadisticas
+    # se agregan aqui tras cada ronda: los pasos de todas las cadenas cuentan como expansiones.
+    if mode not in ('restart', 'tempering'):
+        raise ValueError(f"unknown mode {mode!r}, expected 'restart' or 'tempering'")
+    energy = RubikSolver(metric).calculate_energy(cube)
+    temps = [temp * temp_ratio ** k if mode == 'tempering' else temp for k in range(chains)]
+    state = [{'state': cube.state, 'energy': energy, 'best_state': cube.state, 'best_energy': energy,
+              'schedule': schedule(chain_temp, cooling_rate, stop_temp), 'rng': random.Random(seed + k).getstate()}
+             for k, chain_temp in enumerate(temps)]
+    exchange_rng = random.Random(f"{seed}-exchange")
+    steps = expanded = 0
+
+    with ProcessPoolExecutor(workers or os.cpu_count()) as executor:
+        while True:
+            state = list(executor.map(_anneal_chain, repeat(metric), state, repeat(exchange_interval)))
+            best = min(state, key=lambda chain: chain['best_energy'])
+            steps += max(chain['steps'] for chain in state)
+            expanded += sum(chain['steps'] for chain in state)
+            if stats is not None:
+                stats.expand(steps, len(state), count=sum(chain['steps'] for chain in state))
+            if best['best_energy'] == 0 or all(chain['schedule'].cold() for chain in state):
+                break
+            if budget is not None and budget.exceeded(expanded):
+                break
+            if mode == 'restart':
+                worst = max(state, key=lambda chain: chain['energy'])
+                worst['state'], worst['energy'] = best['best_state'], best['best_energy']
+            else:
+                for hot, cold in zip(state, state[1:]):
+                    hot_temp, cold_temp = hot['schedule'].temp, cold['schedule'].temp
+                    delta = (hot['energy'] - cold['energy']) * (1 / hot_temp - 1 / cold_temp)
+                    if delta >= 0 or exchange_rng.random() < math.exp(delta):
+                        hot['state'], cold['state'] = cold['state'], hot['state']
+                        hot['energy'], cold['energy'] = cold['energy'], hot['energy']
+    return RubikCube(best['best_state']), best['best_energy'], expanded
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    scrambles = [[random.choice(METRICS['HTM']) for _ in range(25)] for _ in range(40)]
+    start_time = time.perf_counter()
+    lengths = []
+    for result in solve_batch(scrambles, "Two-Phase", max_time=0.5):
+        lengths.append(len(result['solution']))
+        print(f"#{result['index']}: {len(result['solution'])} moves in {result['time']:.2f} s (pid {result['worker']})")
+    elapsed = time.perf_counter() - start_time
+    print(f"Solved {len(lengths)} scrambles in {elapsed:.2f} s ({len(lengths) / elapsed:.1f} cubes/s), "
+          f"average length {sum(lengths) / len(lengths):.1f}")
@@ -0,0 +1,79 @@
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+
+
+def memory_usage():
+    # RSS cuenta las paginas compartidas en cada proceso; PSS las reparte entre ellos
+    usage = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss', 'Shared_Clean', 'Private_Dirty'):
+                    usage[key] = int(value.split()[0]) * 1024
+    except OSError:
+        import resource
+        usage['Rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return usage
+
+
+def worker(metric, lookups):
+    start_time = time.perf_counter()
+    from rubik import METRICS, RubikCube, pattern_heuristic
+    heuristic = pattern_heuristic(metric)
+    startup = time.perf_counter() - start_time
+
+    # Lee una pagina de cada 4 KiB para que todas las tablas queden residentes
+    for database in heuristic.databases:
+        sum(database.table[::4096])
+    cube = RubikCube()
+    random.seed(0)
+    for _ in range(lookups):
+        cube.rotate(random.choice(METRICS[metric]))
+        heuristic(cube)
+
+    print(json.dumps({'startup': startup}), flush=True)
+    # Espera a que todos los procesos esten cargados antes de medir la memoria
+    sys.stdin.readline()
+    print(json.dumps(memory_usage()), flush=True)
+    # Y no termina hasta que todos han medido: si no, los que midieran despues repartirian
+    # las paginas compartidas entre menos procesos
+    sys.stdin.readline()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Startup time and memory of N concurrent solver processes")
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--metric', choices=['HTM', 'QTM'], default='HTM')
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.metric, args.lookups)
+        sys.exit()
+
+    command = [sys.executable, __file__, '--worker', '--metric', args.metric, '--lookups', str(args.lookups)]
+    workers = [subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+               for _ in range(args.processes)]
+    startups = [json.loads(process.stdout.readline())['startup'] for process in workers]
+    for process in workers:
+        process.stdin.write('\n')
+        process.stdin.flush()
+    usages = [json.loads(process.stdout.readline()) for process in workers]
+    for process in workers:
+        process.stdin.close()
+        process.wait()
+
+    print(f"Processes: {args.processes}")
+    print(f"Startup (import + load tables): avg {sum(startups) / len(startups) * 1000:.1f} ms, "
+          f"max {max(startups) * 1000:.1f} ms")
+    for key in ('Rss', 'Pss', 'Shared_Clean', 'Private_Dirty'):
+        values = [usage[key] for usage in usages if key in usage]
+        if values:
+            print(f"{key}: {sum(values) / len(values) / 2 ** 20:.1f} MiB/process, "
+                  f"{sum(values) / 2 ** 20:.1f} MiB total")
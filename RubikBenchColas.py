@@ -0,0 +1,84 @@
+import argparse
+import random
+import time
+
+from rubik import BucketQueue, HeapQueue, RubikCube, RubikSolver, pattern_heuristic
+from RubikTestTiempos import measure, scramble_corpus
+
+QUEUES = {"BucketQueue": BucketQueue, "HeapQueue": HeapQueue}
+
+
+def fill_and_drain(frontier, size, seed):
+    # Prioridades y desempates como los de A* (f y g pequenos): se llena la cola y se vacia
+    rng = random.Random(seed)
+    entries = [(rng.randrange(20), rng.randrange(20)) for _ in range(size)]
+    queue = frontier()
+    start_time = time.perf_counter()
+    for node, (priority, tie) in enumerate(entries):
+        queue.push(node, priority, tie)
+    while queue:
+        queue.pop()
+    return time.perf_counter() - start_time
+
+
+def expand(frontier, size, seed):
+    # Patron de una busqueda: cada pop inserta 13 hijos con f igual o algo mayor y g + 1
+    rng = random.Random(seed)
+    offsets = [rng.choice((0, 0, 1, 2)) for _ in range(size + 13)]
+    queue = frontier()
+    queue.push(0, 0, 0)
+    node = 1
+    start_time = time.perf_counter()
+    while node < size:
+        priority, tie, _ = queue.pop()
+        for _ in range(13):
+            queue.push(node, priority + offsets[node], min(tie + 1, 20))
+            node += 1
+    while queue:
+        queue.pop()
+    return time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Open lists: bucket queue against heapq")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10 ** 4, 10 ** 5, 10 ** 6])
+    parser.add_argument('--depths', nargs='+', type=int, default=[5, 6, 7])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    print("Push and pop (ns per operation):")
+    for size in args.sizes:
+        for workload in (fill_and_drain, expand):
+            times = {name: workload(frontier, size, args.seed) for name, frontier in QUEUES.items()}
+            print(f"  {workload.__name__}, {size:,} nodes: " + ", ".join(
+                f"{name} {elapsed / (2 * size) * 1e9:.0f}" for name, elapsed in times.items()), flush=True)
+    print()
+
+    solver = RubikSolver('HTM')
+    heuristics = {"heuristic4": solver.heuristic4, "pattern databases": pattern_heuristic('HTM')}
+    heuristics["pattern databases"](RubikCube())
+    searches = [("A*", 'solve_a_star', "heuristic4"), ("A*", 'solve_a_star', "pattern databases"),
+                ("Best-first", 'solve_best_first_search', "pattern databases")]
+    for depth in args.depths:
+        corpus = scramble_corpus(depth, args.runs, args.seed)
+        print(f"Searches, depth {depth} ({args.runs} scrambles):")
+        for label, method, heuristic_name in searches:
+            for name, frontier in QUEUES.items():
+                nodes = elapsed = length = 0
+                peak = None
+                for scramble in corpus:
+                    solution, time_taken, memory = measure(solver, getattr(solver, method), scramble,
+                                                           not args.no_memory, heuristics[heuristic_name],
+                                                           frontier=frontier, max_nodes=200000)
+                    nodes += solver.nodes_expanded
+                    elapsed += time_taken
+                    length += len(solution)
+                    if memory is not None:
+                        peak = max(peak or 0, memory)
+                memory = f"{peak / 2 ** 20:.1f} MiB" if peak is not None else "-"
+                print(f"  {label} with {heuristic_name}, {name}: {length / len(corpus):.1f} moves, "
+                      f"{nodes / len(corpus):,.0f} nodes, {elapsed / len(corpus):.3f} s/solve, peak {memory}",
+                      flush=True)
+        print()
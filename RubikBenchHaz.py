@@ -0,0 +1,54 @@
+import argparse
+
+from rubik import SOLVED, RubikCube, RubikSolver, pattern_heuristic
+from RubikTestTiempos import measure, percentile, scramble_corpus
+
+# Puntos de operacion: busqueda en haz por anchura y A* ponderado por peso (1 es A* normal)
+WIDTHS = [10, 100, 1000, 3000]
+WEIGHTS = [1, 1.5, 2, 3, 5]
+
+
+def run_setting(solver, solve, heuristic, corpus, memory, max_time, **options):
+    solved, lengths, times, peaks = 0, [], [], []
+    for scramble in corpus:
+        solution, elapsed, peak = measure(solver, solve, scramble, memory, heuristic, max_time=max_time, **options)
+        times.append(elapsed)
+        if solver.status == SOLVED:
+            solved += 1
+            lengths.append(len(solution))
+        if peak is not None:
+            peaks.append(peak)
+    return solved, lengths, times, peaks
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Beam search and weighted A*: solution length against time and memory")
+    parser.add_argument('--widths', nargs='+', type=int, default=WIDTHS)
+    parser.add_argument('--weights', nargs='+', type=float, default=WEIGHTS)
+    parser.add_argument('--depths', nargs='+', type=int, default=[8, 10, 12])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--heuristic', choices=['pattern', 'heuristic4'], default='pattern')
+    parser.add_argument('--max-time', type=float, default=10.0, help="time limit per solve, in seconds")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    solver = RubikSolver('HTM')
+    if args.heuristic == 'pattern':
+        heuristic = pattern_heuristic('HTM')
+        heuristic(RubikCube())
+    else:
+        heuristic = solver.heuristic4
+    settings = [(f"Beam search, width {width}", solver.solve_beam_search, {'width': width}) for width in args.widths]
+    settings += [(f"A*, weight {weight:g}", solver.solve_a_star, {'weight': weight}) for weight in args.weights]
+    for depth in args.depths:
+        corpus = scramble_corpus(depth, args.runs, args.seed)
+        print(f"Depth {depth} ({args.runs} scrambles, {args.heuristic}, {args.max_time:g} s limit):")
+        for label, solve, options in settings:
+            solved, lengths, times, peaks = run_setting(solver, solve, heuristic, corpus, not args.no_memory,
+                                                        args.max_time, **options)
+            length = f"{sum(lengths) / len(lengths):.1f} moves" if lengths else "-"
+            memory = f"{max(peaks) / 2 ** 20:.2f} MiB" if peaks else "-"
+            print(f"  {label}: {solved}/{len(corpus)} solved, {length}, mean {sum(times) / len(times):.2f} s, "
+                  f"p95 {percentile(times, 95):.2f} s, peak {memory}", flush=True)
+        print()
@@ -0,0 +1,57 @@
+import argparse
+import time
+import tracemalloc
+
+from rubik import METRICS, RubikCube
+
+# Estados distintos a distancia <= 7 del cubo resuelto (conteos publicados)
+STATES_UP_TO_DEPTH_7 = {'HTM': 109043123, 'QTM': 9205558}
+
+
+def bfs_seen_set(depth, moves, key):
+    # BFS por niveles desde el cubo resuelto; solo se mide el conjunto de visitados
+    start_cube = RubikCube()
+    frontier = [start_cube]
+    tracemalloc.start()
+    seen = {key(start_cube)}
+    for _ in range(depth):
+        next_frontier = []
+        for cube in frontier:
+            for move in moves:
+                new_cube = cube.copy()
+                new_cube.rotate(move)
+                cube_state = key(new_cube)
+                if cube_state not in seen:
+                    seen.add(cube_state)
+                    next_frontier.append(new_cube)
+        frontier = next_frontier
+    # Los cubos de la frontera pesan lo mismo con ambas claves; se liberan antes de medir
+    del frontier, next_frontier
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(seen), memory
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Visited-set memory: str(faces) keys vs compact keys")
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--metric', choices=sorted(METRICS), default='QTM')
+    args = parser.parse_args()
+
+    keys = {
+        'str(faces)': lambda cube: str(cube.faces),
+        'cube.key()': lambda cube: cube.key(),
+    }
+    for label, key in keys.items():
+        start_time = time.perf_counter()
+        states, memory = bfs_seen_set(args.depth, METRICS[args.metric], key)
+        elapsed = time.perf_counter() - start_time
+        per_state = memory / states
+        print(f"Key: {label}")
+        print(f"States (depth <= {args.depth}, {args.metric}): {states}")
+        print(f"Visited set memory: {memory / 2 ** 20:.1f} MiB ({per_state:.0f} bytes/state)")
+        print(f"Time: {elapsed:.2f} s")
+        if args.depth < 7:
+            projected = per_state * STATES_UP_TO_DEPTH_7[args.metric]
+            print(f"Projected for depth 7: {projected / 2 ** 30:.2f} GiB")
+        print()
@@ -0,0 +1,55 @@
+import random
+import time
+
+from rubik import RubikCube
+
+
+class LegacyRubikCube:
+    # Implementacion anterior con listas anidadas, solo para comparar
+    def __init__(self):
+        self.faces = {
+            'F': [['R', 'R', 'R'], ['R', 'R', 'R'], ['R', 'R', 'R']],
+            'B': [['O', 'O', 'O'], ['O', 'O', 'O'], ['O', 'O', 'O']],
+            'U': [['W', 'W', 'W'], ['W', 'W', 'W'], ['W', 'W', 'W']],
+            'D': [['Y', 'Y', 'Y'], ['Y', 'Y', 'Y'], ['Y', 'Y', 'Y']],
+            'L': [['G', 'G', 'G'], ['G', 'G', 'G'], ['G', 'G', 'G']],
+            'R': [['B', 'B', 'B'], ['B', 'B', 'B'], ['B', 'B', 'B']]
+        }
+
+    def rotate_face(self, face):
+        face[:] = [list(row) for row in zip(*face[::-1])]
+
+    def rotate(self, move):
+        self.rotate_face(self.faces[move])
+
+    def copy(self):
+        new_cube = LegacyRubikCube()
+        new_cube.faces = {face: [row[:] for row in self.faces[face]] for face in self.faces}
+        return new_cube
+
+
+def moves_per_second(cube, moves, copy=False):
+    start = time.perf_counter()
+    if copy:
+        # Patron de las busquedas: copiar el cubo y aplicar un movimiento
+        for move in moves:
+            cube = cube.copy()
+            cube.rotate(move)
+    else:
+        for move in moves:
+            cube.rotate(move)
+    return len(moves) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    moves = [random.choice(['F', 'B', 'U', 'D', 'L', 'R']) for _ in range(200000)]
+
+    for label, copy in (("rotate", False), ("copy + rotate", True)):
+        before = moves_per_second(LegacyRubikCube(), moves, copy)
+        after = moves_per_second(RubikCube(), moves, copy)
+        print(f"{label}:")
+        print(f"Before (nested lists): {before:,.0f} moves/s")
+        print(f"After (move tables): {after:,.0f} moves/s")
+        print(f"Speedup: {after / before:.1f}x")
+        print()
@@ -0,0 +1,61 @@
+import argparse
+import os
+import random
+import time
+
+from rubik import (DEFAULT_PATTERNS, PatternDatabase, PatternHeuristic, RubikCube, RubikSolver, load_pattern_database,
+                   pattern_database_path)
+
+
+class CountingHeuristic:
+    # Cuenta las evaluaciones: cada nodo generado por la busqueda se evalua una vez
+    def __init__(self, heuristic):
+        self.heuristic = heuristic
+        self.calls = 0
+
+    def __call__(self, cube):
+        self.calls += 1
+        return self.heuristic(cube)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pattern database build cost and node-count reduction")
+    parser.add_argument('--metric', choices=['HTM', 'QTM'], default='HTM')
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--rebuild', action='store_true')
+    args = parser.parse_args()
+
+    databases = []
+    for name in DEFAULT_PATTERNS:
+        path = pattern_database_path(name, args.metric)
+        start_time = time.perf_counter()
+        if args.rebuild or not os.path.exists(path):
+            database = PatternDatabase.build(name, args.metric)
+            database.save(path)
+            action = "Build"
+        else:
+            database = load_pattern_database(name, args.metric)
+            action = "Load"
+        elapsed = time.perf_counter() - start_time
+        print(f"{name}: {action} time {elapsed:.1f} s, file size {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+        databases.append(database)
+    print()
+
+    solver = RubikSolver(args.metric)
+    searches = [
+        ("A*", solver.solve_a_star, "heuristic1", solver.heuristic1),
+        ("A*", solver.solve_a_star, "pattern databases", PatternHeuristic(databases)),
+        ("IDA*", solver.solve_ida_star, "heuristic4", solver.heuristic4),
+        ("IDA*", solver.solve_ida_star, "pattern databases", PatternHeuristic(databases)),
+    ]
+    for algorithm, solve, label, heuristic in searches:
+        random.seed(0)
+        counter = CountingHeuristic(heuristic)
+        start_time = time.perf_counter()
+        for _ in range(args.runs):
+            solver.cube = RubikCube()
+            solver.shuffle_cube(args.depth)
+            solve(counter)
+        elapsed = time.perf_counter() - start_time
+        print(f"{algorithm} with {label}: {counter.calls / args.runs:,.0f} nodes/solve, {elapsed / args.runs:.3f} s/solve")
@@ -0,0 +1,69 @@
+import argparse
+import json
+import random
+from functools import partial
+
+from rubik import AdaptiveCooling, GeometricCooling, ReheatingCooling, RubikCube, RubikSolver
+from RubikTestTiempos import scramble_corpus
+
+SCHEDULES = {
+    "geometric": GeometricCooling,
+    "adaptive": AdaptiveCooling,
+    "reheating": ReheatingCooling,
+}
+# Evaluaciones de calculate_energy en las que se compara la mejor energia de cada programa
+CHECKPOINTS = [50, 100, 200, 400, 800, 1200]
+
+
+def best_at(telemetry, initial_energy, evaluations):
+    # Mejor energia tras ese numero de evaluaciones (la inicial cuenta como la primera); si la
+    # cadena termino antes, la mejor que alcanzo
+    best = initial_energy
+    for record in telemetry:
+        if record['step'] + 1 > evaluations:
+            break
+        best = record['best_energy']
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simulated annealing cooling schedules: best energy per evaluation")
+    parser.add_argument('--depth', type=int, default=20)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--patience', type=int, default=100, help="early termination window for the second pass")
+    parser.add_argument('--target', type=float, default=0.5, help="acceptance rate target of the adaptive schedule")
+    parser.add_argument('--telemetry', help="write the per-iteration telemetry of every run to this JSON file")
+    args = parser.parse_args()
+
+    solver = RubikSolver('HTM')
+    corpus = scramble_corpus(args.depth, args.runs, args.seed)
+    schedules = dict(SCHEDULES, adaptive=partial(AdaptiveCooling, target=args.target))
+    dump = {}
+    print(f"Depth {args.depth}, {args.runs} scrambles; best energy after N calculate_energy evaluations:")
+    for patience in (None, args.patience):
+        for name, schedule in schedules.items():
+            label = name if patience is None else f"{name}, patience {patience}"
+            curves, finals, evaluations = [], [], []
+            for k, scramble in enumerate(corpus):
+                start = RubikCube()
+                for move in scramble:
+                    start.rotate(move)
+                solver.cube = start.copy()
+                telemetry = []
+                final = solver.solve_simulated_annealing(rng=random.Random(f"{args.seed}-{k}"), schedule=schedule,
+                                                         patience=patience, telemetry=telemetry)
+                initial = solver.calculate_energy(start)
+                curves.append([best_at(telemetry, initial, checkpoint) for checkpoint in CHECKPOINTS])
+                finals.append(final)
+                evaluations.append(solver.nodes_expanded + 1)
+                dump.setdefault(label, []).append(telemetry)
+            means = [sum(curve[i] for curve in curves) / len(curves) for i in range(len(CHECKPOINTS))]
+            print(f"  {label}: " + ", ".join(f"{checkpoint}: {mean:.2f}" for checkpoint, mean in zip(CHECKPOINTS, means))
+                  + f"; final {sum(finals) / len(finals):.2f} after {sum(evaluations) / len(evaluations):.0f} "
+                  f"evaluations, {finals.count(0)} solved", flush=True)
+
+    if args.telemetry:
+        with open(args.telemetry, 'w') as f:
+            json.dump(dump, f)
+        print(f"Telemetry written to {args.telemetry}")
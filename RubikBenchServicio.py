@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from rubik import ROTATION_TABLES, rotate_moves
+from RubikServicio import SolveService, serve
+from RubikTestTiempos import percentile, scramble_corpus
+
+# Generador de carga para RubikServicio: 'concurrency' clientes en bucle cerrado envian
+# 'requests' peticiones sobre 'distinct' mezclas base. Cada peticion es una de ellas vista
+# desde una orientacion al azar, asi que las repetidas simultaneas se agrupan en el servicio;
+# una fraccion de los clientes abandona la peticion (cierra la conexion) antes de la respuesta.
+
+
+async def send(address, payload, abandon_after=None):
+    # Devuelve (codigo HTTP, cuerpo JSON), o None si la peticion se abandono
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+    body = json.dumps(payload).encode()
+    writer.write(f"POST /solve HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    try:
+        try:
+            response = await asyncio.wait_for(reader.read(), abandon_after)
+        except asyncio.TimeoutError:
+            return None
+    finally:
+        writer.close()
+    head, _, content = response.partition(b'\r\n\r\n')
+    return int(head.split(b' ', 2)[1]), json.loads(content)
+
+
+async def fetch_stats(address):
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+    writer.write(b"GET /stats HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.partition(b'\r\n\r\n')[2])
+
+
+async def generate_load(address, args):
+    rng = random.Random(args.seed)
+    bases = scramble_corpus(args.depth, args.distinct, args.seed)
+    payloads = []
+    for _ in range(args.requests):
+        scramble = rotate_moves(rng.choice(bases), rng.randrange(len(ROTATION_TABLES)))
+        payload = {'scramble': ' '.join(scramble), 'algorithm': args.algorithm, 'deadline': args.deadline}
+        if args.heuristic:
+            payload['heuristic'] = args.heuristic
+        if args.max_time is not None:
+            payload['options'] = {'max_time': args.max_time}
+        abandon = args.abandon_after if rng.random() < args.abandon else None
+        payloads.append((payload, abandon))
+
+    latencies, codes = [], Counter()
+    queue = iter(payloads)
+
+    async def client():
+        for payload, abandon in queue:
+            start_time = time.perf_counter()
+            result = await send(address, payload, abandon)
+            if result is None:
+                codes['abandoned'] += 1
+                continue
+            codes[result[0]] += 1
+            if result[0] == 200:
+                latencies.append(time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start_time
+    return latencies, codes, elapsed
+
+
+async def main(args):
+    service = server = None
+    address = args.unix or (args.host, args.port)
+    if args.host is None and args.unix is None:
+        # Sin servicio externo se arranca uno en este mismo bucle sobre un socket Unix temporal
+        address = os.path.join(tempfile.mkdtemp(), 'rubik.sock')
+        service = SolveService(args.workers, args.max_pending)
+        server = await serve(service, unix=address)
+    try:
+        # Calentamiento: carga las tablas del algoritmo en los trabajadores
+        warmup = {'scramble': "R U", 'algorithm': args.algorithm, 'deadline': 120}
+        if args.heuristic:
+            warmup['heuristic'] = args.heuristic
+        await asyncio.gather(*(send(address, warmup) for _ in range(args.workers or os.cpu_count())))
+        before = await fetch_stats(address)
+        latencies, codes, elapsed = await generate_load(address, args)
+        after = await fetch_stats(address)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+    answered = sum(count for code, count in codes.items() if code != 'abandoned')
+    print(f"{args.requests} requests ({args.distinct} distinct scrambles, concurrency {args.concurrency}) "
+          f"in {elapsed:.2f} s: {answered / elapsed:.1f} responses/s")
+    print("Status codes: " + ", ".join(f"{code}: {count}" for code, count in sorted(codes.items(), key=str)))
+    if latencies:
+        print(f"Latency of 200 responses: p50 {percentile(latencies, 50) * 1000:.1f} ms, "
+              f"p95 {percentile(latencies, 95) * 1000:.1f} ms, p99 {percentile(latencies, 99) * 1000:.1f} ms, "
+              f"max {max(latencies) * 1000:.1f} ms")
+    delta = {name: after[name] - before[name] for name in after if name in before and name != 'pending'}
+    print("Service: " + ", ".join(f"{name} {value}" for name, value in delta.items()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load generator for the solve service")
+    parser.add_argument('--host', help="service host (default: start a local service on a Unix socket)")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', help="service Unix socket")
+    parser.add_argument('--workers', type=int, default=None, help="workers of the local service")
+    parser.add_argument('--max-pending', type=int, default=None, help="pending computations of the local service")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--distinct', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--depth', type=int, default=20)
+    parser.add_argument('--algorithm', default="Two-Phase")
+    parser.add_argument('--heuristic', default=None)
+    parser.add_argument('--max-time', type=float, default=None,
+                        help="solver max_time option (default: none, the service uses what is left of the deadline)")
+    parser.add_argument('--deadline', type=float, default=5.0)
+    parser.add_argument('--abandon', type=float, default=0.1, help="fraction of requests abandoned by the client")
+    parser.add_argument('--abandon-after', type=float, default=0.05, help="seconds before abandoning")
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,91 @@
+import argparse
+import os
+import time
+
+from rubik import (DEFAULT_PATTERNS, SYMMETRIC_PATTERNS, PatternDatabase, RubikCube, RubikSolver,
+                   load_pattern_database, pattern_database_path, pattern_heuristic)
+from RubikTestTiempos import measure, scramble_corpus
+
+# Estados distintos a distancia <= d del resuelto en HTM (conteos publicados); con simetria
+# la BFS guarda clases, unas 48 veces menos a partir de la profundidad 6
+STATES_UP_TO_DEPTH = {6: 8240086, 7: 109043123, 8: 1441386411}
+# Por encima de estas profundidades la busqueda no cabe en memoria o tarda demasiado
+MAX_DEPTH = {
+    ("BFS", False): 5,
+    ("BFS", True): 7,
+    ("Vectorized BFS", False): 6,
+    ("Vectorized BFS", True): 8,
+}
+SEARCHES = {"BFS": 'solve_bfs', "Vectorized BFS": 'solve_vectorized_bfs'}
+# Posiciones simetricas: A* con symmetry=True solo reduce la busqueda cuando el cubo inicial lo es
+SYMMETRIC_POSITIONS = {
+    "Pons asinorum": "U2 D2 F2 B2 R2 L2",
+    "Six spot": "U D' R L' F B' U D'",
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Symmetry reduction: visited states, memory and time")
+    parser.add_argument('--depths', nargs='+', type=int, default=[5, 6, 7, 8])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--skip-patterns', action='store_true')
+    parser.add_argument('--rebuild', action='store_true', help="rebuild the corner pattern databases")
+    args = parser.parse_args()
+
+    solver = RubikSolver('HTM')
+    print("Searches (HTM, one scramble per depth):")
+    for depth in args.depths:
+        scramble = scramble_corpus(depth, 1, args.seed)[0]
+        for algorithm, method in SEARCHES.items():
+            for symmetry in (False, True):
+                label = f"{algorithm}{' with symmetry' if symmetry else ''}, depth {depth}"
+                if depth > MAX_DEPTH[(algorithm, symmetry)]:
+                    states = STATES_UP_TO_DEPTH.get(depth)
+                    print(f"  {label}: skipped" + (f" ({states:,} states up to depth {depth})" if states else ""))
+                    continue
+                solution, elapsed, peak = measure(solver, getattr(solver, method), scramble, not args.no_memory,
+                                                  symmetry=symmetry)
+                memory = f"{peak / 2 ** 20:.1f} MiB" if peak is not None else "-"
+                print(f"  {label}: {len(solution)} moves in {elapsed:.2f} s, {solver.nodes_expanded:,} nodes "
+                      f"expanded, peak {memory}", flush=True)
+    print()
+
+    print("A* with the symmetric pattern databases:")
+    heuristic = pattern_heuristic('HTM', SYMMETRIC_PATTERNS)
+    positions = {name: scramble.split() for name, scramble in SYMMETRIC_POSITIONS.items()}
+    positions["Random (depth 8)"] = scramble_corpus(8, 1, args.seed)[0]
+    for name, scramble in positions.items():
+        # Una pasada sin medir carga las paginas de las tablas que consulta esta posicion
+        measure(solver, solver.solve_a_star, scramble, False, heuristic)
+        for symmetry in (False, True):
+            solution, elapsed, peak = measure(solver, solver.solve_a_star, scramble, False, heuristic,
+                                              symmetry=symmetry)
+            print(f"  {name}{' with symmetry' if symmetry else ''}: {len(solution)} moves in {elapsed:.2f} s, "
+                  f"{solver.nodes_expanded:,} nodes expanded", flush=True)
+    print()
+
+    if not args.skip_patterns:
+        print("Corner pattern databases (HTM):")
+        for name in ('corners', 'corners_sym'):
+            path = pattern_database_path(name)
+            start_time = time.perf_counter()
+            if args.rebuild or not os.path.exists(path):
+                PatternDatabase.build(name).save(path)
+                action = "Build"
+            else:
+                load_pattern_database(name)
+                action = "Load"
+            elapsed = time.perf_counter() - start_time
+            print(f"  {name}: {action} time {elapsed:.1f} s, file size {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+        corpus = scramble_corpus(9, 5, args.seed)
+        for names in (DEFAULT_PATTERNS, SYMMETRIC_PATTERNS):
+            heuristic = pattern_heuristic('HTM', names)
+            heuristic(RubikCube())
+            nodes = elapsed = 0
+            for scramble in corpus:
+                _, time_taken, _ = measure(solver, solver.solve_ida_star, scramble, False, heuristic)
+                nodes += solver.nodes_expanded
+                elapsed += time_taken
+            print(f"  IDA* with {'+'.join(names)}, depth 9: {nodes / len(corpus):,.0f} nodes/solve, "
+                  f"{elapsed / len(corpus):.3f} s/solve")
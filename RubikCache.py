@@ -0,0 +1,117 @@
+import sqlite3
+from collections import OrderedDict
+
+from RubikCompleto import SOLVED, canonical_state, rotate_moves
+
+# Cache de soluciones: las mezclas repetidas, o que solo difieren en como se sostiene el
+# cubo o en el esquema de colores, comparten una entrada guardada en el marco canonico.
+# En memoria es un LRU acotado; opcionalmente se persiste en un archivo SQLite.
+
+
+class SolutionCache:
+    def __init__(self, capacity=100000, path=None):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('PRAGMA synchronous=NORMAL')
+            self.db.execute('CREATE TABLE IF NOT EXISTS solutions (key BLOB PRIMARY KEY, moves TEXT NOT NULL)')
+            self.db.commit()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, tag, state):
+        # Solucion para el estado en su propio marco, o None si no esta en la cache
+        canonical, rotation = canonical_state(state)
+        key = tag.encode() + b':' + canonical
+        moves = self.entries.get(key)
+        if moves is not None:
+            self.entries.move_to_end(key)
+        elif self.db is not None:
+            row = self.db.execute('SELECT moves FROM solutions WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                moves = tuple(row[0].split())
+                self._remember(key, moves)
+        if moves is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return rotate_moves(moves, rotation, inverse=True)
+
+    def store(self, tag, state, solution):
+        canonical, rotation = canonical_state(state)
+        key = tag.encode() + b':' + canonical
+        moves = tuple(rotate_moves(solution, rotation))
+        self._remember(key, moves)
+        if self.db is not None:
+            self.db.execute('INSERT OR REPLACE INTO solutions (key, moves) VALUES (?, ?)', (key, ' '.join(moves)))
+            self.db.commit()
+
+    def _remember(self, key, moves):
+        self.entries[key] = moves
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def solve(self, solver, algorithm, *args, tag=None, **kwargs):
+        # Llama a solver.<algorithm>(*args, **kwargs) solo si el estado no esta en la cache.
+        # Por defecto la entrada depende de la metrica y del algoritmo, no de la heuristica
+        tag = tag or f"{solver.metric}:{algorithm}"
+        state = solver.cube.state
+        solution = self.lookup(tag, state)
+        if solution is not None:
+            solver.nodes_expanded = 0
+            solver.status = SOLVED
+            return solution
+        solution = getattr(solver, algorithm)(*args, **kwargs)
+        # Solo se guardan soluciones completas (no resultados parciales ni energias)
+        if solver.status == SOLVED and isinstance(solution, list):
+            self.store(tag, state, solution)
+        return solution
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+if __name__ == '__main__':
+    import random
+    import time
+    from RubikCompleto import MOVES_HTM, ROTATION_TABLES, RubikCube, RubikSolver
+
+    # Trafico con repeticiones: 20 mezclas base, cada consulta es una de ellas girada y con
+    # los colores cambiados
+    random.seed(0)
+    bases = []
+    for _ in range(20):
+        cube = RubikCube()
+        for _ in range(25):
+            cube.rotate(random.choice(MOVES_HTM))
+        bases.append(cube.state)
+
+    solver = RubikSolver()
+    cache = SolutionCache(capacity=1000)
+    hit_times, miss_times = [], []
+    for _ in range(200):
+        base = random.choice(bases)
+        rotation = random.choice(ROTATION_TABLES)
+        colors = random.sample(range(6), 6)
+        solver.cube = RubikCube(bytes(colors[base[i]] for i in rotation))
+        misses = cache.misses
+        start_time = time.perf_counter()
+        solution = cache.solve(solver, 'solve_two_phase', max_time=0.5)
+        elapsed = time.perf_counter() - start_time
+        (miss_times if cache.misses > misses else hit_times).append(elapsed)
+        for move in solution:
+            solver.cube.rotate(move)
+        assert solver.is_solved(solver.cube)
+
+    print(f"Hits: {cache.hits}, misses: {cache.misses}, entries: {len(cache)}")
+    print(f"Average miss: {sum(miss_times) / len(miss_times) * 1000:.1f} ms, "
+          f"average hit: {sum(hit_times) / len(hit_times) * 1e6:.1f} us")
@@ -1,161 +1,1193 @@
 import random
 import heapq
+from array import array
 from collections import deque
 import math
+import time
+from operator import itemgetter
+
+# Orden de las caras en el estado empaquetado y color de cada una resuelta
+FACE_ORDER = ['U', 'R', 'F', 'D', 'L', 'B']
+COLORS = ['W', 'B', 'R', 'Y', 'G', 'O']
+COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+
+# Estado resuelto: 54 stickers, 9 por cara, cada uno guarda el indice de su color
+SOLVED_STATE = bytes(i // 9 for i in range(54))
+
+# Ejes: x hacia R, y hacia U, z hacia F. Para cada cara: normal, "derecha" y "abajo"
+# vistas de frente, con U arriba para las caras laterales, B arriba en U y F arriba en D
+_FACE_FRAMES = {
+    'U': ((0, 1, 0), (1, 0, 0), (0, 0, 1)),
+    'R': ((1, 0, 0), (0, 0, -1), (0, -1, 0)),
+    'F': ((0, 0, 1), (1, 0, 0), (0, -1, 0)),
+    'D': ((0, -1, 0), (1, 0, 0), (0, 0, -1)),
+    'L': ((-1, 0, 0), (0, 0, 1), (0, -1, 0)),
+    'B': ((0, 0, -1), (-1, 0, 0), (0, -1, 0)),
+}
+
+# Stickers de cada esquina y arista (URF, UFL, ... / UR, UF, ...), el primero en U/D
+# o, para las aristas del corte medio, en F/B
+CORNER_FACELETS = [
+    (8, 9, 20), (6, 18, 38), (0, 36, 47), (2, 45, 11),
+    (29, 26, 15), (27, 44, 24), (33, 53, 42), (35, 17, 51),
+]
+EDGE_FACELETS = [
+    (5, 10), (7, 19), (3, 37), (1, 46), (32, 16), (28, 25),
+    (30, 43), (34, 52), (23, 12), (21, 41), (50, 39), (48, 14),
+]
+CORNER_COLORS = [tuple(i // 9 for i in corner) for corner in CORNER_FACELETS]
+EDGE_COLORS = [tuple(i // 9 for i in edge) for edge in EDGE_FACELETS]
+
+# Movimientos por metrica: HTM cuenta los medios giros como un movimiento, QTM no
+MOVES_HTM = [face + suffix for face in ['F', 'B', 'U', 'D', 'L', 'R'] for suffix in ('', "'", '2')]
+MOVES_QTM = [face + suffix for face in ['F', 'B', 'U', 'D', 'L', 'R'] for suffix in ('', "'")]
+METRICS = {'HTM': MOVES_HTM, 'QTM': MOVES_QTM}
+INVERSE_MOVES = {move: move[0] + {'': "'", "'": '', '2': '2'}[move[1:]] for move in MOVES_HTM}
+OPPOSITE_FACES = {'F': 'B', 'B': 'F', 'U': 'D', 'D': 'U', 'L': 'R', 'R': 'L'}
+
+
+def _sticker_positions():
+    # Posicion del cubito y normal de cada sticker
+    stickers = []
+    for face in FACE_ORDER:
+        normal, right, down = _FACE_FRAMES[face]
+        for r in range(3):
+            for c in range(3):
+                position = tuple(n + (c - 1) * x + (r - 1) * y for n, x, y in zip(normal, right, down))
+                stickers.append((position, normal))
+    return stickers
+
+
+def _turn(vector, axis):
+    # Giro de 90 grados en sentido horario mirando la cara desde fuera
+    dot = sum(v * a for v, a in zip(vector, axis))
+    cross = (
+        axis[1] * vector[2] - axis[2] * vector[1],
+        axis[2] * vector[0] - axis[0] * vector[2],
+        axis[0] * vector[1] - axis[1] * vector[0],
+    )
+    return tuple(a * dot - c for a, c in zip(axis, cross))
+
+
+def _compose(first, second):
+    return tuple(first[i] for i in second)
+
+
+def _build_move_tables():
+    # Cada movimiento es una permutacion de 54 indices: nuevo[i] = viejo[tabla[i]]
+    stickers = _sticker_positions()
+    index = {sticker: i for i, sticker in enumerate(stickers)}
+    tables = {}
+    for face in FACE_ORDER:
+        axis = _FACE_FRAMES[face][0]
+        table = list(range(54))
+        for i, (position, normal) in enumerate(stickers):
+            if sum(p * a for p, a in zip(position, axis)) == 1:
+                table[index[(_turn(position, axis), _turn(normal, axis))]] = i
+        quarter = tuple(table)
+        half = _compose(quarter, quarter)
+        tables[face] = quarter
+        tables[face + '2'] = half
+        tables[face + "'"] = _compose(half, quarter)
+    return tables
+
+
+MOVE_TABLES = _build_move_tables()
+_MOVE_GATHER = {move: itemgetter(*table) for move, table in MOVE_TABLES.items()}
+
+
+def _build_rotation_tables():
+    # Las 24 rotaciones del cubo entero (la primera es la identidad), generadas por giros
+    # completos alrededor de los ejes de R y de U. Mismo formato que las tablas de movimientos
+    stickers = _sticker_positions()
+    index = {sticker: i for i, sticker in enumerate(stickers)}
+    generators = []
+    for face in ('R', 'U'):
+        axis = _FACE_FRAMES[face][0]
+        table = [0] * 54
+        for i, (position, normal) in enumerate(stickers):
+            table[index[(_turn(position, axis), _turn(normal, axis))]] = i
+        generators.append(tuple(table))
+    rotations = [tuple(range(54))]
+    for rotation in rotations:
+        for generator in generators:
+            composed = _compose(rotation, generator)
+            if composed not in rotations:
+                rotations.append(composed)
+    return rotations
+
+
+ROTATION_TABLES = _build_rotation_tables()
+_ROTATION_GATHER = [itemgetter(*table) for table in ROTATION_TABLES]
+# Cara a la que cada rotacion lleva cada cara (segun adonde va su centro)
+ROTATION_FACES = [
+    {FACE_ORDER[i]: FACE_ORDER[table.index(9 * i + 4) // 9] for i in range(6)} for table in ROTATION_TABLES
+]
+_CENTERS = SOLVED_STATE[4::9]
+
+
+def canonical_state(state):
+    # Representante comun de un estado girado en cualquiera de las 24 orientaciones y con
+    # cualquier asignacion de colores: se gira el cubo entero, se renombran los colores para
+    # que cada centro tenga el de su cara y se queda el menor. Devuelve (estado, rotacion)
+    best = None
+    for rotation, gather in enumerate(_ROTATION_GATHER):
+        rotated = bytes(gather(state))
+        candidate = rotated.translate(bytes.maketrans(rotated[4::9], _CENTERS))
+        if best is None or candidate < best:
+            best, best_rotation = candidate, rotation
+    return best, best_rotation
+
+
+def rotate_moves(moves, rotation, inverse=False):
+    # Traduce movimientos al marco girado: aplicar m y luego la rotacion es lo mismo que
+    # aplicar la rotacion y luego rotate_moves([m]). Las rotaciones no invierten el sentido
+    faces = ROTATION_FACES[rotation]
+    if inverse:
+        faces = {target: face for face, target in faces.items()}
+    return [faces[move[0]] + move[1:] for move in moves]
+
+
+def _build_symmetry_tables():
+    # Las 48 simetrias del cubo: las 24 rotaciones y las mismas seguidas del reflejo
+    # izquierda-derecha (x -> -x). El reflejo cambia el sentido de los giros (R pasa a L'),
+    # pero no la longitud de las soluciones
+    stickers = _sticker_positions()
+    index = {sticker: i for i, sticker in enumerate(stickers)}
+    mirror = [0] * 54
+    for i, (position, normal) in enumerate(stickers):
+        mirror[index[((-position[0],) + position[1:], (-normal[0],) + normal[1:])]] = i
+    mirror = tuple(mirror)
+    return ROTATION_TABLES + [_compose(rotation, mirror) for rotation in ROTATION_TABLES]
+
+
+SYMMETRY_TABLES = _build_symmetry_tables()
+
+
+def _build_symmetry_moves():
+    # Aplicar m y despues la simetria s es lo mismo que aplicar la simetria y despues
+    # SYMMETRY_MOVES[s][m] (con el reflejo, R pasa a L'). Basta con los cuartos de vuelta
+    names = {table: move for move, table in MOVE_TABLES.items()}
+    symmetry_moves = []
+    for table in SYMMETRY_TABLES:
+        inverse = [0] * 54
+        for i, source in enumerate(table):
+            inverse[source] = i
+        moves = {}
+        for face in FACE_ORDER:
+            image = names[tuple(inverse[MOVE_TABLES[face][i]] for i in table)]
+            moves[face], moves[INVERSE_MOVES[face]], moves[face + '2'] = image, INVERSE_MOVES[image], image[0] + '2'
+        symmetry_moves.append(moves)
+    return symmetry_moves
+
+
+SYMMETRY_MOVES = _build_symmetry_moves()
+_STICKERS_WITHOUT_CENTERS = [i for i in range(54) if i % 9 != 4]
+
+
+def symmetry_relabels(state):
+    # Tabla de colores de cada simetria (para bytes.translate): tras mover los stickers los
+    # centros vuelven a tener el color de su cara. Solo depende de los centros del estado
+    return [bytes.maketrans(bytes(state[i] for i in table)[4::9], _CENTERS) for table in SYMMETRY_TABLES]
+
+
+def symmetry_reducer(state):
+    # Clave para los visitados con la que los estados equivalentes por alguna de las 48
+    # simetrias coinciden: la menor de sus imagenes con los colores renombrados. Todos estan a
+    # la misma distancia del resuelto, asi que basta con visitar uno. Los centros no se mueven
+    # durante la busqueda, asi que las tablas de colores se calculan una vez (con el estado
+    # inicial). Se comparan primero 8 stickers de cada imagen y solo se construyen enteras
+    # las que empatan
+    images = []
+    for table, relabel in zip(SYMMETRY_TABLES, symmetry_relabels(state)):
+        positions = [table[i] for i in _STICKERS_WITHOUT_CENTERS]
+        images.append((itemgetter(*positions[:8]), itemgetter(*positions), relabel))
+
+    def key(cube):
+        stickers = cube.state
+        best = None
+        for prefix_gather, gather, relabel in images:
+            prefix = bytes(prefix_gather(stickers)).translate(relabel)
+            if best is None or prefix < best:
+                best, tied = prefix, [(gather, relabel)]
+            elif prefix == best:
+                tied.append((gather, relabel))
+        return min(bytes(gather(stickers)).translate(relabel) for gather, relabel in tied)
+
+    return key
+
+
+def symmetric_solution(state, image, path):
+    # path lleva del resuelto a image, que es state visto a traves de alguna simetria: se
+    # busca cual, se traducen los movimientos y se invierte el camino para resolver state.
+    # Las imagenes tienen los colores de las caras, asi que se compara con state renombrado
+    relabels = symmetry_relabels(state)
+    target = state.translate(relabels[0])
+    for table, relabel, moves in zip(SYMMETRY_TABLES, relabels, SYMMETRY_MOVES):
+        if bytes(image[i] for i in table).translate(relabel) == target:
+            return [INVERSE_MOVES[moves[move]] for move in reversed(path)]
+    raise ValueError("the image is not symmetric to the state")
+
+
+def _parity(permutation):
+    parity = 0
+    for i in range(len(permutation)):
+        for j in range(i + 1, len(permutation)):
+            if permutation[i] > permutation[j]:
+                parity ^= 1
+    return parity
+
+
+def state_to_cubies(state):
+    # Devuelve (cp, co, ep, eo): que esquina/arista hay en cada posicion y su orientacion
+    if len(state) != 54:
+        raise ValueError(f"a cube state has 54 stickers, got {len(state)}")
+    centers = [state[9 * f + 4] for f in range(6)]
+    if sorted(centers) != list(range(6)):
+        raise ValueError("the six centers must have six different colors")
+    # Los colores se leen respecto a los centros, asi vale cualquier esquema de colores
+    face_of = {color: f for f, color in enumerate(centers)}
+    stickers = [face_of.get(color) for color in state]
+    if None in stickers:
+        raise ValueError("unknown sticker color")
+
+    cp, co = [], []
+    for i, corner in enumerate(CORNER_FACELETS):
+        colors = [stickers[j] for j in corner]
+        for ori in range(3):
+            if colors[ori] in (0, 3):
+                break
+        else:
+            raise ValueError(f"corner {i} has no U or D sticker")
+        piece = (colors[ori], colors[(ori + 1) % 3], colors[(ori + 2) % 3])
+        if piece not in CORNER_COLORS:
+            raise ValueError(f"corner {i} has an impossible color combination")
+        cp.append(CORNER_COLORS.index(piece))
+        co.append(ori)
+
+    ep, eo = [], []
+    for i, edge in enumerate(EDGE_FACELETS):
+        colors = tuple(stickers[j] for j in edge)
+        if colors in EDGE_COLORS:
+            ep.append(EDGE_COLORS.index(colors))
+            eo.append(0)
+        elif colors[::-1] in EDGE_COLORS:
+            ep.append(EDGE_COLORS.index(colors[::-1]))
+            eo.append(1)
+        else:
+            raise ValueError(f"edge {i} has an impossible color combination")
+    return cp, co, ep, eo
+
+
+def validate_state(state):
+    cp, co, ep, eo = state_to_cubies(state)
+    if sorted(cp) != list(range(8)):
+        raise ValueError("some corner appears more than once")
+    if sorted(ep) != list(range(12)):
+        raise ValueError("some edge appears more than once")
+    if sum(co) % 3:
+        raise ValueError("twisted corner: corner orientations do not add up")
+    if sum(eo) % 2:
+        raise ValueError("flipped edge: edge orientations do not add up")
+    if _parity(cp) != _parity(ep):
+        raise ValueError("parity error: two pieces are swapped")
+
+
+def pruned_successors(moves):
+    # Para cada estado (None al inicio, si no el indice del ultimo movimiento), pares
+    # (indice del movimiento, estado siguiente) que vale la pena probar: nunca la misma cara
+    # dos veces y las caras opuestas conmutan, asi que solo se prueban en un orden. En QTM se
+    # permite X X (que es X2) pero no X X X: tras X X el estado es len(moves) + indice de X
+    faces = ['F', 'B', 'U', 'D', 'L', 'R']
+    half_turns = any(move.endswith('2') for move in moves)
+    successors = {None: [(move_index, move_index) for move_index in range(len(moves))]}
+    for last_index, last in enumerate(moves):
+        allowed = []
+        for move_index, move in enumerate(moves):
+            if move[0] == last[0]:
+                if half_turns or move != last or move != move[0]:
+                    continue
+                allowed.append((move_index, len(moves) + move_index))
+                continue
+            if move[0] == OPPOSITE_FACES[last[0]] and faces.index(move[0]) < faces.index(last[0]):
+                continue
+            allowed.append((move_index, move_index))
+        successors[last_index] = allowed
+        if not half_turns:
+            successors[len(moves) + last_index] = [pair for pair in allowed if moves[pair[0]][0] != last[0]]
+    return successors
+
+
+# Posiciones de esquinas y aristas junto con el centro de la cara de cada sticker
+_CORNER_CHECKS = [tuple((i, 9 * (i // 9) + 4) for i in corner) for corner in CORNER_FACELETS]
+_EDGE_CHECKS = [tuple((i, 9 * (i // 9) + 4) for i in edge) for edge in EDGE_FACELETS]
+
+# Estado resuelto de un cubo: cada sticker del color del centro de su cara. Los centros no
+# se mueven, asi que solo depende del esquema de colores y se calcula una vez por esquema
+_CENTER_GATHER = itemgetter(*(9 * (i // 9) + 4 for i in range(54)))
+_solved_targets = {}
+
+
+def solved_target(state):
+    # Devuelve el estado resuelto y el mismo estado como entero (para contar diferencias con XOR)
+    centers = state[4::9]
+    target = _solved_targets.get(centers)
+    if target is None:
+        goal = bytes(_CENTER_GATHER(state))
+        target = _solved_targets[centers] = (goal, int.from_bytes(goal, 'big'))
+    return target
+
+
+def mismatches(state):
+    # Stickers que no coinciden con el centro de su cara. Un XOR sobre los 54 bytes deja
+    # un cero en cada sticker correcto. Es O(54) a nivel de C: convierte y compara los 54 bytes
+    # en cada llamada (no solo los que movio el ultimo giro), pero sin recorrer el estado en Python
+    _, goal = solved_target(state)
+    return 54 - (int.from_bytes(state, 'big') ^ goal).to_bytes(54, 'big').count(0)
+
+
+def faces_to_state(faces):
+    return bytes(COLOR_INDEX[color] for face in FACE_ORDER for row in faces[face] for color in row)
+
+
+def state_to_faces(state):
+    return {
+        face: [[COLORS[state[9 * f + 3 * r + c]] for c in range(3)] for r in range(3)]
+        for f, face in enumerate(FACE_ORDER)
+    }
+
 
 class RubikCube:
-    def __init__(self):
-        self.faces = {
-            'F': [['R', 'R', 'R'], ['R', 'R', 'R'], ['R', 'R', 'R']],
-            'B': [['O', 'O', 'O'], ['O', 'O', 'O'], ['O', 'O', 'O']],
-            'U': [['W', 'W', 'W'], ['W', 'W', 'W'], ['W', 'W', 'W']],
-            'D': [['Y', 'Y', 'Y'], ['Y', 'Y', 'Y'], ['Y', 'Y', 'Y']],
-            'L': [['G', 'G', 'G'], ['G', 'G', 'G'], ['G', 'G', 'G']],
-            'R': [['B', 'B', 'B'], ['B', 'B', 'B'], ['B', 'B', 'B']]
-        }
+    __slots__ = ('state',)
+
+    def __init__(self, state=SOLVED_STATE):
+        self.state = state
+
+    @property
+    def faces(self):
+        # Copia en el formato anterior; modificarla no cambia el cubo
+        return state_to_faces(self.state)
 
-    def rotate_face(self, face):
-        face[:] = [list(row) for row in zip(*face[::-1])]
+    @faces.setter
+    def faces(self, faces):
+        state = faces_to_state(faces)
+        validate_state(state)
+        self.state = state
+
+    def copy(self):
+        # El estado es inmutable, asi que la copia comparte el mismo buffer
+        return RubikCube(self.state)
 
     def rotate(self, move):
-        self.rotate_face(self.faces[move])
+        self.state = bytes(_MOVE_GATHER[move](self.state))
+
+    def validate(self):
+        validate_state(self.state)
+
+    def key(self):
+        # Clave hashable para los conjuntos de visitados: los centros no se mueven,
+        # asi que los 54 bytes ya son canonicos y no hay que construir nada
+        return self.state
 
     def print_cube(self):
+        faces = self.faces
         for face in ['U', 'R', 'F', 'D', 'L', 'B']:
             print(f"{face}:")
-            for row in self.faces[face]:
+            for row in faces[face]:
                 print(' '.join(row))
             print()
 
-class RubikSolver:
+class NodeArena:
+    # Arbol de busqueda compacto: por nodo solo se guarda el padre y el indice del
+    # movimiento; el camino se reconstruye una vez, al encontrar la solucion
+    __slots__ = ('parents', 'moves')
+
     def __init__(self):
+        self.parents = array('i', [-1])
+        self.moves = bytearray(1)
+
+    def add(self, parent, move_index):
+        self.parents.append(parent)
+        self.moves.append(move_index)
+        return len(self.moves) - 1
+
+    def path(self, node, moves):
+        path = []
+        while node > 0:
+            path.append(moves[self.moves[node]])
+            node = self.parents[node]
+        path.reverse()
+        return path
+
+    def depth(self, node):
+        depth = 0
+        while node > 0:
+            node = self.parents[node]
+            depth += 1
+        return depth
+
+
+class BucketQueue:
+    # Lista abierta para prioridades enteras pequenas (f = g + h en A*, h en primero el
+    # mejor): una fila de cubetas por prioridad y, dentro de ella, una cubeta por desempate
+    # (g). Sale la menor prioridad y, a igualdad, el mayor desempate; dentro de cada cubeta,
+    # el primero en entrar (como el heap por id de nodo) o el ultimo con lifo=True, que en
+    # primero el mejor se hunde en caminos de miles de movimientos. Solo guarda ids de nodo.
+    # push y pop son O(1) amortizados: la fila mas baja solo retrocede al insertar por debajo
+    __slots__ = ('rows', 'lowest', 'offset', 'size', 'lifo')
+
+    def __init__(self, lifo=False):
+        self.rows = []
+        self.lowest = 0
+        # Las heuristicas 1 a 3 son negativas: la fila de la prioridad p es p + offset
+        self.offset = 0
+        self.size = 0
+        self.lifo = lifo
+
+    def __len__(self):
+        return self.size
+
+    def push(self, node, priority, tie=0):
+        index = priority + self.offset
+        if index < 0:
+            self.rows[:0] = [[] for _ in range(-index)]
+            self.offset -= index
+            self.lowest -= index
+            index = 0
+        rows = self.rows
+        while len(rows) <= index:
+            rows.append([])
+        row = rows[index]
+        while len(row) <= tie:
+            row.append(deque())
+        row[tie].append(node)
+        if index < self.lowest:
+            self.lowest = index
+        self.size += 1
+
+    def pop(self):
+        # Devuelve (prioridad, desempate, nodo). La ultima cubeta de cada fila nunca esta vacia
+        if not self.size:
+            raise IndexError("pop from an empty queue")
+        rows = self.rows
+        lowest = self.lowest
+        while not rows[lowest]:
+            lowest += 1
+        self.lowest = lowest
+        row = rows[lowest]
+        tie = len(row) - 1
+        node = row[tie].pop() if self.lifo else row[tie].popleft()
+        while row and not row[-1]:
+            row.pop()
+        self.size -= 1
+        return lowest - self.offset, tie, node
+
+
+class HeapQueue:
+    # La misma interfaz y el mismo orden que BucketQueue sobre heapq (O(log n) por operacion).
+    # Las tuplas solo tienen enteros, asi que los empates nunca llegan a comparar cubos
+    __slots__ = ('heap', 'lifo')
+
+    def __init__(self, lifo=False):
+        self.heap = []
+        self.lifo = lifo
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, node, priority, tie=0):
+        heapq.heappush(self.heap, (priority, -tie, -node if self.lifo else node))
+
+    def pop(self):
+        priority, tie, node = heapq.heappop(self.heap)
+        return priority, -tie, -node if self.lifo else node
+
+
+class SearchStats:
+    # Instrumentacion opcional de una busqueda. Los solve_* la reciben como stats=None, y
+    # sin ella el bucle solo paga una comparacion con None por nodo expandido.
+    # progress(stats) se llama cada 'every' nodos expandidos.
+    def __init__(self, progress=None, every=10000):
+        self.progress = progress
+        self.every = every
+        self.expanded = 0
+        self.duplicates = 0
+        self.max_frontier = 0
+        self.max_depth = 0
+        self.heuristic_calls = 0
+        self.heuristic_time = 0.0
+        self.started = time.perf_counter()
+        self._next_report = every
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def expand(self, depth, frontier, count=1):
+        self.expanded += count
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if frontier > self.max_frontier:
+            self.max_frontier = frontier
+        if self.progress is not None and self.expanded >= self._next_report:
+            self._next_report = self.expanded + self.every
+            self.progress(self)
+
+    def timed(self, heuristic):
+        # Envuelve la heuristica para medir cuanto tiempo se va en evaluarla
+        def timed_heuristic(cube):
+            start_time = time.perf_counter()
+            value = heuristic(cube)
+            self.heuristic_time += time.perf_counter() - start_time
+            self.heuristic_calls += 1
+            return value
+        return timed_heuristic
+
+    def as_dict(self):
+        return {
+            'expanded': self.expanded,
+            'duplicates': self.duplicates,
+            'max_frontier': self.max_frontier,
+            'max_depth': self.max_depth,
+            'heuristic_calls': self.heuristic_calls,
+            'heuristic_time': self.heuristic_time,
+            'elapsed': self.elapsed,
+        }
+
+
+# Resultado de la ultima busqueda (RubikSolver.status)
+SOLVED = 'solved'
+EXHAUSTED = 'exhausted'
+TIME_LIMIT = 'time_limit'
+NODE_LIMIT = 'node_limit'
+VISITED_LIMIT = 'visited_limit'
+
+
+class SearchBudget:
+    # Limites de una busqueda: segundos de reloj, nodos expandidos y estados en el conjunto
+    # de visitados. La busqueda registra su mejor resultado parcial (menor puntuacion) y,
+    # si se agota un limite, para y devuelve ese resultado con status indicando cual fue
+    def __init__(self, max_time=None, max_nodes=None, max_visited=None):
+        self.deadline = None if max_time is None else time.perf_counter() + max_time
+        self.max_nodes = max_nodes
+        self.max_visited = max_visited
+        self.status = None
+        self.best = None
+
+    def exceeded(self, expanded, visited=0):
+        if self.max_nodes is not None and expanded >= self.max_nodes:
+            self.status = NODE_LIMIT
+        elif self.max_visited is not None and visited >= self.max_visited:
+            self.status = VISITED_LIMIT
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.status = TIME_LIMIT
+        return self.status is not None
+
+    def improves(self, score):
+        return self.best is None or score < self.best[0]
+
+    def record(self, score, result):
+        if self.improves(score):
+            self.best = (score, result)
+
+
+def search_budget(max_time=None, max_nodes=None, max_visited=None):
+    # Sin limites no hay presupuesto y los bucles no comprueban nada
+    if max_time is None and max_nodes is None and max_visited is None:
+        return None
+    return SearchBudget(max_time, max_nodes, max_visited)
+
+
+class GeometricCooling:
+    # Programas de temperatura del recocido. El recocido crea uno por cadena con
+    # schedule(temp, rate, stop_temp), llama a update tras cada paso y para cuando cold()
+    # es cierto. Este es el geometrico de siempre: temp *= rate en cada paso
+    def __init__(self, temp=30, rate=0.99, stop_temp=0.1):
+        self.temp = temp
+        self.rate = rate
+        self.stop_temp = stop_temp
+
+    def cold(self):
+        return self.temp <= self.stop_temp
+
+    def update(self, accepted, improved):
+        self.temp *= self.rate
+
+
+class AdaptiveCooling(GeometricCooling):
+    # Enfria segun la tasa de aceptacion de los ultimos window pasos: mientras la cadena
+    # acepte mas de target (casi un paseo al azar, sin ganar nada) se enfria rate**fast por
+    # paso; por debajo, al ritmo normal
+    def __init__(self, temp=30, rate=0.99, stop_temp=0.1, target=0.5, window=20, fast=10):
+        super().__init__(temp, rate, stop_temp)
+        self.target = target
+        self.fast = fast
+        self.recent = deque(maxlen=window)
+        self.accepted = 0
+
+    def update(self, accepted, improved):
+        if len(self.recent) == self.recent.maxlen:
+            self.accepted -= self.recent[0]
+        self.recent.append(accepted)
+        self.accepted += accepted
+        if self.accepted > self.target * len(self.recent):
+            self.temp *= self.rate ** self.fast
+        else:
+            self.temp *= self.rate
+
+
+class ReheatingCooling(GeometricCooling):
+    # Geometrico, pero si la mejor energia no mejora en patience pasos y la cadena ya esta
+    # por debajo de reheat veces la temperatura inicial, vuelve a calentarla hasta ahi (como
+    # mucho max_reheats veces)
+    def __init__(self, temp=30, rate=0.99, stop_temp=0.1, patience=50, reheat=0.2, max_reheats=3):
+        super().__init__(temp, rate, stop_temp)
+        self.initial = temp
+        self.patience = patience
+        self.reheat = reheat
+        self.max_reheats = max_reheats
+        self.reheats = 0
+        self.stale = 0
+
+    def update(self, accepted, improved):
+        self.temp *= self.rate
+        self.stale = 0 if improved else self.stale + 1
+        if self.stale >= self.patience:
+            self.stale = 0
+            if self.reheats < self.max_reheats and self.temp < self.reheat * self.initial:
+                self.temp = self.reheat * self.initial
+                self.reheats += 1
+
+
+class RubikSolver:
+    def __init__(self, metric='HTM'):
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric {metric!r}, expected one of {sorted(METRICS)}")
         self.cube = RubikCube()
+        self.metric = metric
+        self.moves = METRICS[metric]
+        # Nodos expandidos (estados cuyos sucesores se generaron) y resultado de la ultima busqueda
+        self.nodes_expanded = 0
+        self.status = None
 
     def shuffle_cube(self, num_moves=20):
-        moves = ['F', 'B', 'U', 'D', 'L', 'R']
         for _ in range(num_moves):
-            move = random.choice(moves)
+            move = random.choice(self.moves)
             self.cube.rotate(move)
 
     def is_solved(self, cube):
-        for face in cube.faces:
-            if not all(color == cube.faces[face][0][0] for row in cube.faces[face] for color in row):
-                return False
-        return True
+        state = cube.state
+        return state == solved_target(state)[0]
 
     def copy_cube(self, cube):
-        new_cube = RubikCube()
-        new_cube.faces = {face: [row[:] for row in cube.faces[face]] for face in cube.faces}
-        return new_cube
+        return cube.copy()
 
     def heuristic1(self, cube):
         # Heurística 1: Cuenta el número de caras resueltas
-        solved_faces = sum(1 for face in cube.faces if all(cube.faces[face][0][0] == cell for row in cube.faces[face] for cell in row))
+        state = cube.state
+        solved_faces = sum(1 for i in range(0, 54, 9) if state[i:i + 9].count(state[i]) == 9)
         return -solved_faces
 
     def heuristic2(self, cube):
         # Heurística 2: Cuenta el número de colores únicos en las caras
-        unique_colors = len(set(color for face in cube.faces for row in cube.faces[face] for color in row))
+        unique_colors = len(set(cube.state))
         return -unique_colors
 
     def heuristic3(self, cube):
         # Heurística 3: Cuenta el número de colores repetidos en las caras
-        repeated_colors = sum(1 for face in cube.faces for row in cube.faces[face] for color in row if row.count(color) > 1)
+        state = cube.state
+        repeated_colors = 0
+        for i in range(0, 54, 3):
+            row = state[i:i + 3]
+            repeated_colors += sum(1 for color in row if row.count(color) > 1)
         return -repeated_colors
 
-    def solve_bfs(self):
-        queue = deque([(self.copy_cube(self.cube), [])])
-        seen = set()
+    def heuristic4(self, cube):
+        # Heurística 4: Cota inferior admisible. Cada giro mueve 4 esquinas y 4 aristas,
+        # asi que hacen falta al menos ceil(piezas fuera de sitio / 4) movimientos
+        state = cube.state
+        corners = sum(1 for corner in _CORNER_CHECKS if any(state[i] != state[c] for i, c in corner))
+        edges = sum(1 for edge in _EDGE_CHECKS if any(state[i] != state[c] for i, c in edge))
+        return (max(corners, edges) + 3) // 4
+
+    def solve_bfs(self, stats=None, max_time=None, max_nodes=None, max_visited=None, symmetry=False):
+        # Con algun limite, el resultado parcial es el camino al estado con menos stickers mal colocados.
+        # Con symmetry=True se busca por clases de simetria desde el resuelto (ver _symmetric_bfs)
+        self.nodes_expanded = 0
+        budget = search_budget(max_time, max_nodes, max_visited)
+        if symmetry:
+            return self._symmetric_bfs(stats, budget)
+        arena = NodeArena()
+        queue = deque([(self.copy_cube(self.cube), 0)])
+        seen = {self.cube.key()}
         while queue:
-            current_cube, moves = queue.popleft()
+            current_cube, node = queue.popleft()
             if self.is_solved(current_cube):
-                return moves
-            for move in ['F', 'B', 'U', 'D', 'L', 'R']:
+                self.status = SOLVED
+                return arena.path(node, self.moves)
+            if budget is not None:
+                budget.record(mismatches(current_cube.state), node)
+                if budget.exceeded(self.nodes_expanded, len(seen)):
+                    self.status = budget.status
+                    return arena.path(budget.best[1], self.moves)
+            self.nodes_expanded += 1
+            if stats is not None:
+                stats.expand(arena.depth(node), len(queue))
+            for move_index, move in enumerate(self.moves):
+                new_cube = self.copy_cube(current_cube)
+                new_cube.rotate(move)
+                cube_state = new_cube.key()
+                if cube_state not in seen:
+                    seen.add(cube_state)
+                    queue.append((new_cube, arena.add(node, move_index)))
+                elif stats is not None:
+                    stats.duplicates += 1
+        self.status = EXHAUSTED
+        return None
+
+    def _symmetric_bfs(self, stats, budget):
+        # Un estado y sus imagenes por simetria estan a la misma distancia del resuelto, pero no
+        # del cubo inicial: desde un cubo cualquiera casi nunca se encuentran dos de la misma
+        # clase. El resuelto es simetrico, asi que la busqueda va del resuelto hacia la clase del
+        # cubo inicial y cada nivel tiene hasta 48 veces menos clases que estados. Al parar por
+        # un limite no hay resultado parcial (los caminos parten del resuelto)
+        key = symmetry_reducer(self.cube.state)
+        target = key(self.cube)
+        goal = RubikCube(solved_target(self.cube.state)[0])
+        if key(goal) == target:
+            self.status = SOLVED
+            return []
+        arena = NodeArena()
+        queue = deque([(goal, 0)])
+        seen = {key(goal)}
+        while queue:
+            current_cube, node = queue.popleft()
+            if budget is not None and budget.exceeded(self.nodes_expanded, len(seen)):
+                self.status = budget.status
+                return None
+            self.nodes_expanded += 1
+            if stats is not None:
+                stats.expand(arena.depth(node), len(queue))
+            for move_index, move in enumerate(self.moves):
                 new_cube = self.copy_cube(current_cube)
                 new_cube.rotate(move)
-                cube_state = str(new_cube.faces)
+                cube_state = key(new_cube)
+                if cube_state == target:
+                    self.status = SOLVED
+                    path = arena.path(arena.add(node, move_index), self.moves)
+                    return symmetric_solution(self.cube.state, new_cube.state, path)
                 if cube_state not in seen:
                     seen.add(cube_state)
-                    queue.append((new_cube, moves + [move]))
+                    queue.append((new_cube, arena.add(node, move_index)))
+                elif stats is not None:
+                    stats.duplicates += 1
+        self.status = EXHAUSTED
+        return None
 
-    def solve_best_first_search(self, heuristic):
-        priority_queue = []
-        initial_state = (heuristic(self.cube), self.copy_cube(self.cube), [])
-        heapq.heappush(priority_queue, initial_state)
-        seen = set()
+    def solve_vectorized_bfs(self, max_depth=None, stats=None, max_time=None, max_nodes=None, max_visited=None,
+                             symmetry=False):
+        # BFS por niveles con NumPy (importacion diferida, como las tablas de dos fases)
+        from RubikVectorBFS import solve_vectorized_bfs
+        budget = search_budget(max_time, max_nodes, max_visited)
+        level_sizes = []
+        solution = solve_vectorized_bfs(self.cube, self.metric, max_depth, level_sizes=level_sizes, stats=stats,
+                                        budget=budget, symmetry=symmetry)
+        # Se expanden todos los niveles menos el ultimo generado
+        self.nodes_expanded = 1 + sum(level_sizes[:-1]) if level_sizes else 0
+        if budget is not None and budget.status is not None:
+            self.status = budget.status
+        else:
+            self.status = EXHAUSTED if solution is None else SOLVED
+        return solution
+
+    def solve_best_first_search(self, heuristic, stats=None, max_time=None, max_nodes=None, max_visited=None,
+                                frontier=BucketQueue):
+        # La lista abierta guarda ids de nodo (frontier: BucketQueue o HeapQueue) y el estado de
+        # cada nodo va en states. Con algun limite, el resultado parcial es el camino al estado
+        # expandido con menor heuristica
+        self.nodes_expanded = 0
+        budget = search_budget(max_time, max_nodes, max_visited)
+        if stats is not None:
+            heuristic = stats.timed(heuristic)
+        arena = NodeArena()
+        states = [self.cube.state]
+        priority_queue = frontier()
+        priority_queue.push(0, heuristic(self.cube))
+        seen = {self.cube.key()}
 
         while priority_queue:
-            _, current_cube, moves = heapq.heappop(priority_queue)
+            h, _, node = priority_queue.pop()
+            current_cube = RubikCube(states[node])
             if self.is_solved(current_cube):
-                return moves
-            for move in ['F', 'B', 'U', 'D', 'L', 'R']:
+                self.status = SOLVED
+                return arena.path(node, self.moves)
+            if budget is not None:
+                budget.record(h, node)
+                if budget.exceeded(self.nodes_expanded, len(seen)):
+                    self.status = budget.status
+                    return arena.path(budget.best[1], self.moves)
+            self.nodes_expanded += 1
+            if stats is not None:
+                stats.expand(arena.depth(node), len(priority_queue))
+            for move_index, move in enumerate(self.moves):
                 new_cube = self.copy_cube(current_cube)
                 new_cube.rotate(move)
-                cube_state = str(new_cube.faces)
+                cube_state = new_cube.key()
                 if cube_state not in seen:
                     seen.add(cube_state)
-                    heapq.heappush(priority_queue, (heuristic(new_cube), new_cube, moves + [move]))
+                    states.append(new_cube.state)
+                    priority_queue.push(arena.add(node, move_index), heuristic(new_cube))
+                elif stats is not None:
+                    stats.duplicates += 1
+        self.status = EXHAUSTED
+        return None
 
-    def solve_a_star(self, heuristic):
-        open_set = []
-        initial_state = (heuristic(self.cube), 0, self.copy_cube(self.cube), [])
-        heapq.heappush(open_set, initial_state)
-        seen = set()
+    def solve_a_star(self, heuristic, stats=None, max_time=None, max_nodes=None, max_visited=None, symmetry=False,
+                     frontier=BucketQueue, weight=1):
+        # Lista abierta por f, a igualdad el de mayor g (ver solve_best_first_search). Con algun
+        # limite, el resultado parcial es el camino al estado expandido con menor heuristica.
+        # Con symmetry=True se visita un estado por clase de simetria (ver symmetry_reducer): solo
+        # reduce la busqueda si el cubo inicial es simetrico (patrones como el superflip).
+        # weight > 1 es A* ponderado, f = g + weight*h: con una heuristica admisible la solucion
+        # mide como mucho weight veces la optima y se expanden muchos menos nodos. Para cumplirlo,
+        # un estado al que se llega por un camino mas corto vuelve a la lista abierta (best_cost
+        # guarda el menor g de cada estado y las entradas con un g peor se descartan). Para que las
+        # prioridades sigan siendo enteras, weight se redondea a dieciseisavos (reducidos con gcd)
+        # y f se escala por el denominador
+        scale_h = round(weight * 16)
+        divisor = math.gcd(scale_h, 16)
+        scale_g, scale_h = 16 // divisor, scale_h // divisor
+        self.nodes_expanded = 0
+        budget = search_budget(max_time, max_nodes, max_visited)
+        if stats is not None:
+            heuristic = stats.timed(heuristic)
+        key = symmetry_reducer(self.cube.state) if symmetry else RubikCube.key
+        arena = NodeArena()
+        states = [self.cube.state]
+        open_set = frontier()
+        open_set.push(0, scale_h * heuristic(self.cube), 0)
+        best_cost = {key(self.cube): 0}
 
         while open_set:
-            _, cost, current_cube, moves = heapq.heappop(open_set)
+            f, cost, node = open_set.pop()
+            current_cube = RubikCube(states[node])
+            if cost > best_cost[key(current_cube)]:
+                continue
             if self.is_solved(current_cube):
-                return moves
-            for move in ['F', 'B', 'U', 'D', 'L', 'R']:
+                self.status = SOLVED
+                return arena.path(node, self.moves)
+            if budget is not None:
+                budget.record(f - scale_g * cost, node)
+                if budget.exceeded(self.nodes_expanded, len(best_cost)):
+                    self.status = budget.status
+                    return arena.path(budget.best[1], self.moves)
+            self.nodes_expanded += 1
+            if stats is not None:
+                stats.expand(cost, len(open_set))
+            new_cost = cost + 1
+            for move_index, move in enumerate(self.moves):
                 new_cube = self.copy_cube(current_cube)
                 new_cube.rotate(move)
-                cube_state = str(new_cube.faces)
-                if cube_state not in seen:
-                    seen.add(cube_state)
-                    new_cost = cost + 1
-                    heapq.heappush(open_set, (heuristic(new_cube) + new_cost, new_cost, new_cube, moves + [move]))
+                cube_state = key(new_cube)
+                if new_cost < best_cost.get(cube_state, math.inf):
+                    best_cost[cube_state] = new_cost
+                    states.append(new_cube.state)
+                    open_set.push(arena.add(node, move_index), scale_h * heuristic(new_cube) + scale_g * new_cost,
+                                  new_cost)
+                elif stats is not None:
+                    stats.duplicates += 1
+        self.status = EXHAUSTED
+        return None
+
+    def solve_beam_search(self, heuristic, width=1000, max_depth=50, stats=None, max_time=None, max_nodes=None,
+                          max_visited=None):
+        # Busqueda en haz: de cada capa solo pasan a la siguiente los width hijos con menor
+        # heuristica, asi que la memoria y el trabajo por capa estan acotados, pero la solucion
+        # no tiene por que ser optima (ni encontrarse). Los hijos de la capa se generan todos
+        # (sin los giros redundantes, como en IDA*) y se puntuan despues en una sola pasada.
+        # Con algun limite, el resultado parcial es el camino al estado conservado con menor heuristica
+        self.nodes_expanded = 0
+        budget = search_budget(max_time, max_nodes, max_visited)
+        if stats is not None:
+            heuristic = stats.timed(heuristic)
+        if self.is_solved(self.cube):
+            self.status = SOLVED
+            return []
+        successors = pruned_successors(self.moves)
+        arena = NodeArena()
+        if budget is not None:
+            budget.record(heuristic(self.cube), 0)
+        layer = [(0, self.copy_cube(self.cube), None)]
+        seen = {self.cube.key()}
+
+        for depth in range(max_depth):
+            children = []
+            layer_seen = set()
+            for node, current_cube, last in layer:
+                if budget is not None and budget.exceeded(self.nodes_expanded, len(seen)):
+                    self.status = budget.status
+                    return arena.path(budget.best[1], self.moves)
+                self.nodes_expanded += 1
+                if stats is not None:
+                    stats.expand(depth, len(layer))
+                for move_index, following in successors[last]:
+                    move = self.moves[move_index]
+                    new_cube = self.copy_cube(current_cube)
+                    new_cube.rotate(move)
+                    cube_state = new_cube.key()
+                    if cube_state in seen or cube_state in layer_seen:
+                        if stats is not None:
+                            stats.duplicates += 1
+                        continue
+                    if self.is_solved(new_cube):
+                        self.status = SOLVED
+                        return arena.path(node, self.moves) + [move]
+                    layer_seen.add(cube_state)
+                    children.append((node, move_index, new_cube, following))
+            if not children:
+                break
+            scores = list(map(heuristic, [child[2] for child in children]))
+            layer = []
+            for i in heapq.nsmallest(width, range(len(children)), key=scores.__getitem__):
+                parent, move_index, new_cube, following = children[i]
+                node = arena.add(parent, move_index)
+                seen.add(new_cube.key())
+                layer.append((node, new_cube, following))
+                if budget is not None:
+                    budget.record(scores[i], node)
+        self.status = EXHAUSTED
+        return None
+
+    def solve_bidirectional(self, stats=None, max_time=None, max_nodes=None, max_visited=None):
+        # BFS desde la mezcla y desde el cubo resuelto a la vez, capa por capa,
+        # expandiendo siempre la frontera mas pequena hasta que se encuentran. Con algun
+        # limite, el resultado parcial es el camino hacia delante al estado con menos
+        # stickers mal colocados
+        self.nodes_expanded = 0
+        budget = search_budget(max_time, max_nodes, max_visited)
+        start = self.copy_cube(self.cube)
+        goal = RubikCube(solved_target(start.state)[0])
+        if start.key() == goal.key():
+            self.status = SOLVED
+            return []
+        forward = (NodeArena(), {start.key(): 0}, [(start, 0)])
+        backward = (NodeArena(), {goal.key(): 0}, [(goal, 0)])
+
+        # Capas expandidas entre los dos sentidos: es la longitud de los caminos que se generan
+        layers = 0
+        while forward[2] and backward[2]:
+            if len(forward[2]) <= len(backward[2]):
+                (arena, seen, frontier), other = forward, backward
+            else:
+                (arena, seen, frontier), other = backward, forward
+            layers += 1
+            next_frontier = []
+            for current_cube, node in frontier:
+                if budget is not None:
+                    if arena is forward[0]:
+                        budget.record(mismatches(current_cube.state), node)
+                    if budget.exceeded(self.nodes_expanded, len(forward[1]) + len(backward[1])):
+                        self.status = budget.status
+                        return forward[0].path(budget.best[1], self.moves) if budget.best else []
+                self.nodes_expanded += 1
+                if stats is not None:
+                    stats.expand(layers, len(frontier) + len(next_frontier))
+                for move_index, move in enumerate(self.moves):
+                    new_cube = self.copy_cube(current_cube)
+                    new_cube.rotate(move)
+                    cube_state = new_cube.key()
+                    if cube_state in seen:
+                        if stats is not None:
+                            stats.duplicates += 1
+                        continue
+                    child = arena.add(node, move_index)
+                    seen[cube_state] = child
+                    if cube_state in other[1]:
+                        # Las capas se expanden completas, asi que el primer cruce es optimo
+                        self.status = SOLVED
+                        return self._join_paths(forward, backward, cube_state)
+                    next_frontier.append((new_cube, child))
+            frontier[:] = next_frontier
+        self.status = EXHAUSTED
+        return None
+
+    def _join_paths(self, forward, backward, meeting_state):
+        first_half = forward[0].path(forward[1][meeting_state], self.moves)
+        second_half = backward[0].path(backward[1][meeting_state], self.moves)
+        return first_half + [INVERSE_MOVES[move] for move in reversed(second_half)]
 
-    def solve_simulated_annealing(self, temp=30, cooling_rate=0.99, stop_temp=0.1):
+    def solve_ida_star(self, heuristic, max_depth=20, stats=None, max_time=None, max_nodes=None):
+        # A* con profundizacion iterativa: solo guarda el camino actual, asi que la memoria
+        # es lineal en la profundidad (no hay conjunto de visitados que limitar). La heuristica
+        # debe ser una cota inferior admisible. Con algun limite, el resultado parcial es el
+        # camino al estado con menor heuristica
+        self.nodes_expanded = 0
+        budget = search_budget(max_time, max_nodes)
+        if stats is not None:
+            heuristic = stats.timed(heuristic)
+        successors = pruned_successors(self.moves)
+        start = self.copy_cube(self.cube)
+        path = []
+        bound = heuristic(start)
+        while bound <= max_depth:
+            result = self._ida_search(start, 0, bound, heuristic, None, path, successors, stats, budget)
+            if result is True:
+                self.status = SOLVED
+                return [self.moves[move_index] for move_index in path]
+            if result is None:
+                self.status = budget.status
+                return [self.moves[move_index] for move_index in budget.best[1]]
+            if result == math.inf:
+                break
+            bound = result
+        self.status = EXHAUSTED
+        return None
+
+    def _ida_search(self, cube, cost, bound, heuristic, last, path, successors, stats, budget):
+        # Devuelve True si encuentra la solucion, None si se agota el presupuesto y si no la
+        # menor estimacion que supero la cota
+        h = heuristic(cube)
+        estimate = cost + h
+        if estimate > bound:
+            return estimate
+        if self.is_solved(cube):
+            return True
+        if budget is not None:
+            if budget.improves(h):
+                budget.record(h, list(path))
+            if budget.exceeded(self.nodes_expanded):
+                return None
+        self.nodes_expanded += 1
+        if stats is not None:
+            # La frontera de IDA* es el camino actual
+            stats.expand(cost, cost)
+        minimum = math.inf
+        for move_index, following in successors[last]:
+            new_cube = self.copy_cube(cube)
+            new_cube.rotate(self.moves[move_index])
+            path.append(move_index)
+            result = self._ida_search(new_cube, cost + 1, bound, heuristic, following, path, successors, stats, budget)
+            if result is True or result is None:
+                return result
+            path.pop()
+            minimum = min(minimum, result)
+        return minimum
+
+    def solve_two_phase(self, max_time=10.0, target_length=None, stats=None):
+        # Importacion diferida: las tablas de dos fases solo se cargan si se usa este algoritmo
+        from RubikKociemba import default_two_phase_solver
+        two_phase = default_two_phase_solver()
+        moves = two_phase.solve(self.cube, max_time, target_length, stats)
+        self.nodes_expanded = two_phase.nodes_expanded
+        # Siempre devuelve una solucion completa: max_time solo corta la mejora de la primera
+        self.status = SOLVED
+        if self.metric == 'QTM':
+            # La solucion se busca en HTM; en QTM cada medio giro son dos cuartos de giro
+            moves = [quarter for move in moves for quarter in ([move[0]] * 2 if move.endswith('2') else [move])]
+        return moves
+
+    def solve_simulated_annealing(self, temp=30, cooling_rate=0.99, stop_temp=0.1, rng=random, stats=None,
+                                  max_time=None, max_nodes=None, schedule=GeometricCooling, patience=None,
+                                  telemetry=None):
+        # Es una busqueda "anytime": con un limite devuelve la mejor energia alcanzada hasta entonces.
+        # schedule es la clase del programa de temperatura (o un functools.partial con sus parametros)
         current_cube = self.copy_cube(self.cube)
         current_energy = self.calculate_energy(current_cube)
-        best_cube = current_cube
-        best_energy = current_energy
-        
-        while temp > stop_temp:
+        self.nodes_expanded = 0
+        budget = search_budget(max_time, max_nodes)
+        _, _, best_cube, best_energy = self.anneal(
+            current_cube, current_energy, current_cube, current_energy, schedule(temp, cooling_rate, stop_temp),
+            rng=rng, stats=stats, budget=budget, patience=patience, telemetry=telemetry)
+        self.cube = best_cube
+        self.status = self._annealing_status(best_energy, budget)
+        return best_energy
+
+    def _annealing_status(self, best_energy, budget):
+        if best_energy == 0:
+            return SOLVED
+        if budget is not None and budget.status is not None:
+            return budget.status
+        return EXHAUSTED
+
+    def solve_parallel_annealing(self, chains=4, workers=None, seed=0, mode='restart', stats=None,
+                                 max_time=None, max_nodes=None, **options):
+        # Importacion diferida: el pool de procesos solo se usa con este algoritmo
+        from RubikBatch import parallel_annealing
+        budget = search_budget(max_time, max_nodes)
+        best_cube, best_energy, self.nodes_expanded = parallel_annealing(
+            self.cube, self.metric, chains, workers, seed, mode, stats=stats, budget=budget, **options)
+        self.cube = best_cube
+        self.status = self._annealing_status(best_energy, budget)
+        return best_energy
+
+    def solve_batch_annealing(self, chains=1024, temp=30, cooling_rate=0.99, stop_temp=0.1, seed=0, stats=None,
+                              max_time=None, max_nodes=None):
+        # Muchas cadenas de recocido a la vez con NumPy (importacion diferida). Como
+        # solve_simulated_annealing, devuelve la mejor energia y deja el mejor estado en self.cube;
+        # batch_annealing da ademas el mejor estado y el recorrido de cada cadena
+        from RubikVectorAnnealing import batch_annealing
+        budget = search_budget(max_time, max_nodes)
+        best_states, best_energies, _, steps = batch_annealing(self.cube, self.metric, chains, temp, cooling_rate,
+                                                               stop_temp, seed, stats=stats, budget=budget)
+        best = int(best_energies.argmin())
+        best_energy = int(best_energies[best])
+        self.cube = RubikCube(best_states[best].tobytes())
+        self.nodes_expanded = steps * chains
+        self.status = self._annealing_status(best_energy, budget)
+        return best_energy
+
+    def anneal(self, current_cube, current_energy, best_cube, best_energy, schedule, steps=None, rng=random,
+               stats=None, budget=None, patience=None, telemetry=None):
+        # Avanza una cadena de recocido con la temperatura de schedule. Con steps se detiene tras
+        # ese numero de pasos y devuelve el estado de la cadena para poder retomarla (lo usa el
+        # recocido en paralelo; la temperatura sigue en schedule). Termina antes al llegar a
+        # energia 0 o, con patience, si la mejor energia no mejora en ese numero de pasos.
+        # telemetry, si es una lista, recibe un diccionario por paso
+        step = 0
+        stale = 0
+        calculate_energy = self.calculate_energy if stats is None else stats.timed(self.calculate_energy)
+        while best_energy > 0 and not schedule.cold() and (steps is None or step < steps):
+            if patience is not None and stale >= patience:
+                break
+            if budget is not None and budget.exceeded(self.nodes_expanded + step):
+                break
             next_cube = self.copy_cube(current_cube)
-            self.make_random_move(next_cube)
-            next_energy = self.calculate_energy(next_cube)
-            
-            if next_energy < current_energy:
+            self.make_random_move(next_cube, rng)
+            next_energy = calculate_energy(next_cube)
+            if stats is not None:
+                # En el recocido la "profundidad" es el numero de pasos de la cadena
+                stats.expand(step + 1, 1)
+
+            accepted = (next_energy < current_energy
+                        or rng.random() < math.exp((current_energy - next_energy) / schedule.temp))
+            improved = accepted and next_energy < best_energy
+            if accepted:
                 current_cube, current_energy = next_cube, next_energy
-                if current_energy < best_energy:
+                if improved:
                     best_cube, best_energy = current_cube, current_energy
-            else:
-                if random.random() < math.exp((current_energy - next_energy) / temp):
-                    current_cube, current_energy = next_cube, next_energy
-            
-            temp *= cooling_rate
-        
-        self.cube = best_cube
-        return best_energy
+            stale = 0 if improved else stale + 1
+            if telemetry is not None:
+                telemetry.append({'step': self.nodes_expanded + step + 1, 'temp': schedule.temp,
+                                  'energy': current_energy, 'best_energy': best_energy, 'accepted': accepted})
+            schedule.update(accepted, improved)
+            step += 1
+
+        # En el recocido cada paso evalua un vecino
+        self.nodes_expanded += step
+        return current_cube, current_energy, best_cube, best_energy
 
     def calculate_energy(self, cube):
-        energy = 0
-        for face in cube.faces:
-            target_color = cube.faces[face][0][0]
-            for row in cube.faces[face]:
-                for color in row:
-                    if color != target_color:
-                        energy += 1
-        return energy
-
-    def make_random_move(self, cube):
-        move = random.choice(['F', 'B', 'U', 'D', 'L', 'R'])
+        # Stickers fuera del color de su centro; es 0 solo con el cubo resuelto
+        return mismatches(cube.state)
+
+    def make_random_move(self, cube, rng=random):
+        move = rng.choice(self.moves)
         cube.rotate(move)
 
 if __name__ == '__main__':
     solver = RubikSolver()
-    solver.shuffle_cube(10)
+    # Con los giros reales la BFS crece como 18^d, asi que la demo usa mezclas cortas
+    solver.shuffle_cube(3)
 
     print("Resuelto con BFS:")
     bfs_solution = solver.solve_bfs()
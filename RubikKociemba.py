@@ -0,0 +1,282 @@
+import time
+from itertools import combinations, permutations
+
+from RubikCompleto import MOVES_HTM, RubikCube, pruned_successors, state_to_cubies, validate_state
+from RubikPDB import (PATTERNS, UNSEEN, _require_numpy, cached_table, cubie_moves, pattern_move_tables,
+                      permutation_rank, rank_rows)
+
+# Algoritmo de dos fases de Kociemba. La fase 1 lleva el cubo al subgrupo G1 (esquinas y
+# aristas orientadas y las aristas del corte medio en su capa); la fase 2 lo resuelve
+# usando solo U, D y medios giros de las caras laterales, que no sacan el cubo de G1.
+# Ambas fases son IDA* sobre coordenadas enteras con tablas de movimientos y de poda.
+
+PHASE2_MOVES = ['U', "U'", 'U2', 'D', "D'", 'D2', 'F2', 'B2', 'L2', 'R2']
+_PHASE2_GLOBAL = [MOVES_HTM.index(move) for move in PHASE2_MOVES]
+
+N_TWIST = 2187
+N_FLIP = 2048
+N_SLICE = 495
+N_PERM8 = 40320
+N_SLICE_PERM = 24
+
+# Posiciones que ocupan las 4 aristas del corte medio (FR, FL, BL, BR), como mascara de bits
+_SLICE_INDEX = {sum(1 << p for p in positions): i for i, positions in enumerate(combinations(range(12), 4))}
+SLICE_SOLVED = _SLICE_INDEX[0b111100000000]
+
+# Longitudes maximas de cada fase (demostradas por Kociemba y Rokicki)
+MAX_PHASE1 = 12
+MAX_PHASE2 = 18
+
+
+def phase1_coordinates(cubies):
+    _, co, ep, eo = cubies
+    twist = 0
+    for value in co[:7]:
+        twist = 3 * twist + value
+    flip = 0
+    for value in eo[:11]:
+        flip = 2 * flip + value
+    slice_ = _SLICE_INDEX[sum(1 << i for i, edge in enumerate(ep) if edge >= 8)]
+    return twist, flip, slice_
+
+
+def phase2_coordinates(cubies):
+    cp, _, ep, _ = cubies
+    return permutation_rank(cp, 8), permutation_rank(ep[:8], 8), permutation_rank([e - 8 for e in ep[8:]], 4)
+
+
+def _flip_move_table():
+    np = _require_numpy()
+    values = np.arange(N_FLIP)
+    flips = np.zeros((N_FLIP, 12), dtype=np.int64)
+    for i in range(10, -1, -1):
+        flips[:, i] = values & 1
+        values = values >> 1
+    flips[:, 11] = flips[:, :11].sum(axis=1) % 2
+    weights = 1 << np.arange(10, -1, -1)
+    table = np.empty((N_FLIP, len(MOVES_HTM)), dtype=np.int32)
+    for m, (_, _, move_ep, move_eo) in enumerate(cubie_moves(MOVES_HTM)):
+        moved = (flips[:, move_ep] + np.array(move_eo)) % 2
+        table[:, m] = moved[:, :11] @ weights
+    return table
+
+
+def _slice_move_table():
+    np = _require_numpy()
+    positions = np.array(list(combinations(range(12), 4)))
+    lookup = np.zeros(1 << 12, dtype=np.int32)
+    for mask, index in _SLICE_INDEX.items():
+        lookup[mask] = index
+    table = np.empty((N_SLICE, len(MOVES_HTM)), dtype=np.int32)
+    for m, (_, _, move_ep, _) in enumerate(cubie_moves(MOVES_HTM)):
+        target = np.empty(12, dtype=np.int64)
+        for i, source in enumerate(move_ep):
+            target[source] = i
+        table[:, m] = lookup[(1 << target[positions]).sum(axis=1)]
+    return table
+
+
+def _phase2_corner_move_table(cache_dir):
+    corner_perm = pattern_move_tables(PATTERNS['corners'], 'HTM', cache_dir)[0]
+    return corner_perm[:, _PHASE2_GLOBAL].astype(_require_numpy().int32)
+
+
+def _ud_edge_move_table():
+    # En la fase 2 las 8 aristas de U y D no salen de sus capas: permutacion de 8
+    np = _require_numpy()
+    perms = np.array(list(permutations(range(8))))
+    table = np.empty((N_PERM8, len(PHASE2_MOVES)), dtype=np.int32)
+    for m, (_, _, move_ep, _) in enumerate(cubie_moves(PHASE2_MOVES)):
+        table[:, m] = rank_rows(perms[:, move_ep[:8]], 8)
+    return table
+
+
+def _slice_perm_move_table():
+    np = _require_numpy()
+    perms = np.array(list(permutations(range(4))))
+    table = np.empty((N_SLICE_PERM, len(PHASE2_MOVES)), dtype=np.int32)
+    for m, (_, _, move_ep, _) in enumerate(cubie_moves(PHASE2_MOVES)):
+        table[:, m] = rank_rows(perms[:, [edge - 8 for edge in move_ep[8:]]], 4)
+    return table
+
+
+def _pair_distances(move_a, move_b, start):
+    # BFS sobre el producto de dos coordenadas: indice = a * len(move_b) + b
+    np = _require_numpy()
+    size_b = len(move_b)
+    distances = np.full(len(move_a) * size_b, UNSEEN, dtype=np.uint8)
+    distances[start] = 0
+    depth = 0
+    while True:
+        frontier = np.flatnonzero(distances == depth)
+        if len(frontier) == 0:
+            return distances
+        a, b = np.divmod(frontier, size_b)
+        for m in range(move_a.shape[1]):
+            neighbours = move_a[a, m].astype(np.int64) * size_b + move_b[b, m]
+            neighbours = neighbours[distances[neighbours] == UNSEEN]
+            distances[neighbours] = depth + 1
+        depth += 1
+
+
+def _flat(table):
+    # Vista plana sobre la tabla (mapeada en memoria) para leerla rapido desde Python
+    return memoryview(table.reshape(-1))
+
+
+class TwoPhaseSolver:
+    def __init__(self, cache_dir=None):
+        def table(name, build):
+            return cached_table(f"twophase-{name}", build, cache_dir)
+
+        corner_perm, twist = pattern_move_tables(PATTERNS['corners'], 'HTM', cache_dir)
+        flip = table('flip-moves', _flip_move_table)
+        slice_ = table('slice-moves', _slice_move_table)
+        corners2 = table('corner-moves', lambda: _phase2_corner_move_table(cache_dir))
+        ud_edges = table('ud-edge-moves', _ud_edge_move_table)
+        slice_perm = table('slice-perm-moves', _slice_perm_move_table)
+
+        self.twist_move = _flat(twist)
+        self.flip_move = _flat(flip)
+        self.slice_move = _flat(slice_)
+        self.corner_move = _flat(corners2)
+        self.ud_edge_move = _flat(ud_edges)
+        self.slice_perm_move = _flat(slice_perm)
+        self.twist_slice_prune = _flat(table('twist-slice-prune', lambda: _pair_distances(twist, slice_, SLICE_SOLVED)))
+        self.flip_slice_prune = _flat(table('flip-slice-prune', lambda: _pair_distances(flip, slice_, SLICE_SOLVED)))
+        self.corner_prune = _flat(table('corner-slice-perm-prune', lambda: _pair_distances(corners2, slice_perm, 0)))
+        self.ud_edge_prune = _flat(table('ud-edge-slice-perm-prune', lambda: _pair_distances(ud_edges, slice_perm, 0)))
+
+        # Sucesores podados de cada fase, indexados por el ultimo movimiento (indice en MOVES_HTM)
+        # En HTM el estado siguiente de pruned_successors es siempre el propio movimiento
+        successors = {last: [m for m, _ in allowed] for last, allowed in pruned_successors(MOVES_HTM).items()}
+        local = {move: i for i, move in enumerate(_PHASE2_GLOBAL)}
+        self.phase1_successors = successors
+        self.phase2_successors = {last: [local[m] for m in allowed if m in local] for last, allowed in successors.items()}
+        # Nodos expandidos (de las dos fases) en la ultima llamada a solve
+        self.nodes_expanded = 0
+
+    def solve(self, cube, max_time=10.0, target_length=None, stats=None):
+        # Devuelve la mejor solucion encontrada; sigue mejorandola mientras quede tiempo.
+        # Si el tiempo se acaba antes de la primera solucion, sigue hasta encontrarla
+        validate_state(cube.state)
+        search = _TwoPhaseSearch(self, cube, time.perf_counter() + max_time, target_length, stats)
+        solution = search.run()
+        self.nodes_expanded = search.nodes
+        return solution
+
+
+class _TwoPhaseSearch:
+    def __init__(self, tables, cube, deadline, target_length, stats):
+        self.tables = tables
+        self.stats = stats
+        self.cube = cube
+        self.deadline = deadline
+        self.target_length = target_length
+        self.best = None
+        self.finished = False
+        self.path = []
+        self.nodes = 0
+
+    def run(self):
+        t = self.tables
+        twist, flip, slice_ = phase1_coordinates(state_to_cubies(self.cube.state))
+        estimate = max(t.twist_slice_prune[twist * N_SLICE + slice_], t.flip_slice_prune[flip * N_SLICE + slice_])
+        for depth in range(estimate, MAX_PHASE1 + 1):
+            # Una fase 1 mas larga que la mejor solucion ya no puede mejorarla
+            if self.finished or (self.best is not None and depth >= len(self.best)):
+                break
+            self.phase1(twist, flip, slice_, depth, None)
+        return [MOVES_HTM[m] for m in self.best]
+
+    def out_of_time(self):
+        if self.best is not None and time.perf_counter() > self.deadline:
+            self.finished = True
+        return self.finished
+
+    def phase1(self, twist, flip, slice_, depth, last):
+        if depth == 0:
+            # Si el ultimo giro ya era de la fase 2, el cubo estaba en G1 antes: se descarta
+            if twist == 0 and flip == 0 and slice_ == SLICE_SOLVED and (last is None or last not in _PHASE2_GLOBAL):
+                self.start_phase2()
+            return
+        if self.out_of_time():
+            return
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.expand(len(self.path), len(self.path))
+        t = self.tables
+        for m in t.phase1_successors[last]:
+            new_twist = t.twist_move[twist * 18 + m]
+            new_flip = t.flip_move[flip * 18 + m]
+            new_slice = t.slice_move[slice_ * 18 + m]
+            if (t.twist_slice_prune[new_twist * N_SLICE + new_slice] < depth
+                    and t.flip_slice_prune[new_flip * N_SLICE + new_slice] < depth):
+                self.path.append(m)
+                self.phase1(new_twist, new_flip, new_slice, depth - 1, m)
+                self.path.pop()
+                if self.finished:
+                    return
+
+    def start_phase2(self):
+        t = self.tables
+        cube = self.cube.copy()
+        for m in self.path:
+            cube.rotate(MOVES_HTM[m])
+        corners, ud_edges, slice_perm = phase2_coordinates(state_to_cubies(cube.state))
+        limit = MAX_PHASE2 if self.best is None else min(MAX_PHASE2, len(self.best) - 1 - len(self.path))
+        estimate = max(t.corner_prune[corners * N_SLICE_PERM + slice_perm],
+                       t.ud_edge_prune[ud_edges * N_SLICE_PERM + slice_perm])
+        last = self.path[-1] if self.path else None
+        for depth in range(estimate, limit + 1):
+            phase2_path = []
+            if self.phase2(corners, ud_edges, slice_perm, depth, last, phase2_path):
+                self.best = self.path + [_PHASE2_GLOBAL[m] for m in phase2_path]
+                if self.target_length is not None and len(self.best) <= self.target_length:
+                    self.finished = True
+                return
+            if self.out_of_time():
+                return
+
+    def phase2(self, corners, ud_edges, slice_perm, depth, last, path):
+        if depth == 0:
+            return corners == 0 and ud_edges == 0 and slice_perm == 0
+        if self.out_of_time():
+            return False
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.expand(len(self.path) + len(path), len(self.path) + len(path))
+        t = self.tables
+        for m in t.phase2_successors[last]:
+            new_corners = t.corner_move[corners * 10 + m]
+            new_ud_edges = t.ud_edge_move[ud_edges * 10 + m]
+            new_slice_perm = t.slice_perm_move[slice_perm * 10 + m]
+            if (t.corner_prune[new_corners * N_SLICE_PERM + new_slice_perm] < depth
+                    and t.ud_edge_prune[new_ud_edges * N_SLICE_PERM + new_slice_perm] < depth):
+                path.append(m)
+                if self.phase2(new_corners, new_ud_edges, new_slice_perm, depth - 1, _PHASE2_GLOBAL[m], path):
+                    return True
+                path.pop()
+        return False
+
+
+_default_solver = None
+
+
+def default_two_phase_solver():
+    # Las tablas se cargan (o se construyen la primera vez) una sola vez por proceso
+    global _default_solver
+    if _default_solver is None:
+        _default_solver = TwoPhaseSolver()
+    return _default_solver
+
+
+if __name__ == '__main__':
+    import random
+    solver = default_two_phase_solver()
+    cube = RubikCube()
+    for _ in range(30):
+        cube.rotate(random.choice(MOVES_HTM))
+    start_time = time.perf_counter()
+    solution = solver.solve(cube, max_time=10.0)
+    print(f"Solution ({len(solution)} moves, {time.perf_counter() - start_time:.2f} s):", ' '.join(solution))
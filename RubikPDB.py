@@ -0,0 +1,440 @@
+import math
+import mmap
+import os
+import struct
+import time
+from itertools import permutations
+
+# NumPy solo hace falta para construir o cargar tablas de movimientos; consultar una
+# base de patrones no lo necesita, asi que se importa la primera vez que se usa
+np = None
+
+from RubikCompleto import (CORNER_COLORS, CORNER_FACELETS, METRICS, SOLVED_STATE, SYMMETRY_TABLES, RubikCube,
+                           state_to_cubies, symmetry_relabels)
+
+# Bases de datos de patrones: distancia exacta al resuelto de una parte del cubo
+# (las 8 esquinas o un grupo de aristas). Como resolver todo el cubo exige resolver
+# cada parte, el maximo de varias bases es una cota inferior admisible.
+
+PDB_MAGIC = b'RPDB'
+PDB_VERSION = 1
+_HEADER = struct.Struct('<4sH4s16sQ')
+TABLE_MAGIC = b'RTBL'
+TABLE_VERSION = 1
+_TABLE_HEADER = struct.Struct('<4sH8sQQ2x')
+UNSEEN = 255
+
+DEFAULT_PATTERNS = ['corners', 'edges_a', 'edges_b']
+# Las mismas cotas con la tabla de esquinas reducida por simetria
+SYMMETRIC_PATTERNS = ['corners_sym', 'edges_a', 'edges_b']
+
+
+def default_cache_dir():
+    return os.environ.get('RUBIK_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'rubik'))
+
+
+def _require_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("building or loading move tables requires numpy") from None
+        np = numpy
+    return np
+
+
+def map_file(path):
+    # Mapeo de solo lectura: los procesos que abren el mismo archivo comparten las paginas
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def save_table(path, array):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    rows, cols = array.shape if array.ndim == 2 else (len(array), 0)
+    header = _TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, array.dtype.str.encode(), rows, cols)
+    # Temporal propio de cada proceso: dos procesos que construyen la misma tabla no escriben
+    # en el mismo archivo, y el ultimo os.replace deja una copia completa
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(header)
+        f.write(array.tobytes())
+    os.replace(temporary, path)
+
+
+def load_table(path):
+    # La tabla queda sobre el mmap: no se copia ni se convierte a listas de Python
+    _require_numpy()
+    data = map_file(path)
+    magic, version, dtype, rows, cols = _TABLE_HEADER.unpack_from(data)
+    if magic != TABLE_MAGIC or version != TABLE_VERSION:
+        raise ValueError(f"{path} is not a version {TABLE_VERSION} table")
+    dtype = np.dtype(dtype.rstrip(b'\0').decode())
+    count = rows * max(cols, 1)
+    if len(data) != _TABLE_HEADER.size + count * dtype.itemsize:
+        raise ValueError(f"{path} is truncated")
+    table = np.frombuffer(data, dtype=dtype, count=count, offset=_TABLE_HEADER.size)
+    return table.reshape(rows, cols) if cols else table
+
+
+def cached_table(name, build, cache_dir=None):
+    path = os.path.join(cache_dir or default_cache_dir(), f"{name}-v{TABLE_VERSION}.tbl")
+    if os.path.exists(path):
+        try:
+            return load_table(path)
+        except ValueError:
+            pass
+    save_table(path, build())
+    return load_table(path)
+
+
+def cubie_moves(moves):
+    # (cp, co, ep, eo) de cada movimiento aplicado al cubo resuelto
+    result = []
+    for move in moves:
+        cube = RubikCube()
+        cube.rotate(move)
+        result.append(state_to_cubies(cube.state))
+    return result
+
+
+def permutation_rank(sequence, n):
+    # Rango lexicografico de una permutacion parcial de k elementos tomados de range(n)
+    rank = 0
+    for t, value in enumerate(sequence):
+        smaller_used = sum(1 for previous in sequence[:t] if previous < value)
+        rank = rank * (n - t) + value - smaller_used
+    return rank
+
+
+def rank_rows(rows, n):
+    # Igual que permutation_rank, pero para todas las filas de una matriz a la vez
+    rank = np.zeros(len(rows), dtype=np.int64)
+    for t in range(rows.shape[1]):
+        smaller_used = (rows[:, :t] < rows[:, t:t + 1]).sum(axis=1)
+        rank = rank * (n - t) + rows[:, t] - smaller_used
+    return rank
+
+
+class CornerPattern:
+    # Las 8 esquinas: permutacion (8! = 40320) por orientacion (3^7 = 2187)
+    name = 'corners'
+    size = 40320 * 2187
+
+    def index(self, cubies):
+        cp, co = cubies[0], cubies[1]
+        orientation = 0
+        for twist in co[:7]:
+            orientation = 3 * orientation + twist
+        return permutation_rank(cp, 8) * 2187 + orientation
+
+    def move_tables(self, moves):
+        _require_numpy()
+        basic = cubie_moves(moves)
+        perms = np.array(list(permutations(range(8))), dtype=np.int64)
+        perm_move = np.empty((len(perms), len(moves)), dtype=np.int64)
+        for m, (move_cp, _, _, _) in enumerate(basic):
+            perm_move[:, m] = rank_rows(perms[:, move_cp], 8)
+
+        # La orientacion esta indexada por posicion, asi que no depende de la permutacion
+        orientations = np.zeros((2187, 8), dtype=np.int64)
+        values = np.arange(2187)
+        for i in range(6, -1, -1):
+            orientations[:, i] = values % 3
+            values //= 3
+        orientations[:, 7] = (-orientations[:, :7].sum(axis=1)) % 3
+        orientation_move = np.empty((2187, len(moves)), dtype=np.int64)
+        for m, (move_cp, move_co, _, _) in enumerate(basic):
+            moved = (orientations[:, move_cp] + np.array(move_co)) % 3
+            orientation_move[:, m] = moved[:, :7] @ (3 ** np.arange(6, -1, -1))
+        return perm_move.astype(np.int32), orientation_move.astype(np.int32)
+
+    def neighbours(self, tables, indices, m):
+        perm_move, orientation_move = tables
+        return perm_move[indices // 2187, m] * 2187 + orientation_move[indices % 2187, m]
+
+
+class SymmetricCornerPattern(CornerPattern):
+    # Las esquinas reducidas por las 16 simetrias que dejan el eje U-D en su sitio (giros
+    # alrededor de U, volteo del cubo y reflejos): la permutacion se cambia por su clase
+    # (2768 en vez de 40320) y la orientacion se ve a traves de la simetria que lleva a la
+    # representante. Las distancias son las de 'corners' en una tabla 14 veces menor. Con
+    # las otras 32 simetrias el giro de cada esquina dependeria de su posicion
+    name = 'corners_sym'
+
+    def __init__(self):
+        self.class_of = None
+        self.arrays = None
+
+    def _prepare(self):
+        # Tablas de simetria en Python: la consulta no necesita NumPy. Tardan unas decimas
+        pieces = {tuple(sorted(colors)): k for k, colors in enumerate(CORNER_COLORS)}
+        symmetries = []
+        for table, relabel in zip(SYMMETRY_TABLES, symmetry_relabels(SOLVED_STATE)):
+            if table[4] not in (4, 31):
+                continue
+            # La esquina de cada posicion sale de sources[j], convertida en otra pieza; en los
+            # reflejos su giro cambia de sentido
+            sources = [next(k for k, source in enumerate(CORNER_FACELETS) if table[corner[0]] in source)
+                       for corner in CORNER_FACELETS]
+            mirror = table[CORNER_FACELETS[0][1]] != CORNER_FACELETS[sources[0]][1]
+            renamed = [pieces[tuple(sorted(relabel[color] for color in colors))] for colors in CORNER_COLORS]
+            symmetries.append((sources, renamed, mirror))
+        inverses = [
+            next(t for t, (back, back_renamed, _) in enumerate(symmetries)
+                 if all(sources[back[j]] == j for j in range(8)) and all(back_renamed[renamed[k]] == k for k in range(8)))
+            for sources, renamed, _ in symmetries
+        ]
+
+        # Clases en orden de rango: la primera permutacion de cada clase es su representante
+        class_of = [None] * 40320
+        symmetry_of = [0] * 40320
+        representatives, stabilizers = [], []
+        for rank, perm in enumerate(permutations(range(8))):
+            if class_of[rank] is not None:
+                continue
+            stable = []
+            for s, (sources, renamed, _) in enumerate(symmetries):
+                image = permutation_rank([renamed[perm[j]] for j in sources], 8)
+                if image == rank:
+                    stable.append(s)
+                if class_of[image] is None:
+                    class_of[image] = len(representatives)
+                    symmetry_of[image] = inverses[s]
+            representatives.append(rank)
+            stabilizers.append(stable)
+
+        twist_images = []
+        for sources, _, mirror in symmetries:
+            images = []
+            for orientation in range(2187):
+                co = []
+                for _ in range(7):
+                    orientation, twist = divmod(orientation, 3)
+                    co.append(twist)
+                co.reverse()
+                co.append(-sum(co) % 3)
+                image = 0
+                for j in range(7):
+                    image = 3 * image + (-co[sources[j]] if mirror else co[sources[j]]) % 3
+                images.append(image)
+            twist_images.append(images)
+        self.representatives, self.stabilizers = representatives, stabilizers
+        self.symmetry_of, self.twist_images = symmetry_of, twist_images
+        self.class_of = class_of
+
+    @property
+    def size(self):
+        if self.class_of is None:
+            self._prepare()
+        return len(self.representatives) * 2187
+
+    def index(self, cubies):
+        if self.class_of is None:
+            self._prepare()
+        cp, co = cubies[0], cubies[1]
+        rank = permutation_rank(cp, 8)
+        orientation = 0
+        for twist in co[:7]:
+            orientation = 3 * orientation + twist
+        return self.class_of[rank] * 2187 + self.twist_images[self.symmetry_of[rank]][orientation]
+
+    def neighbours(self, tables, indices, m):
+        perm_move, orientation_move = tables
+        if self.arrays is None:
+            _require_numpy()
+            if self.class_of is None:
+                self._prepare()
+            stable = np.zeros((len(self.representatives), len(self.twist_images)), dtype=bool)
+            for c, symmetries in enumerate(self.stabilizers):
+                stable[c, symmetries] = True
+            self.arrays = (np.array(self.representatives), np.array(self.class_of), np.array(self.symmetry_of),
+                           np.array(self.twist_images), stable)
+        representatives, class_of, symmetry_of, twist_images, stable = self.arrays
+        perms = perm_move[representatives[indices // 2187], m]
+        classes = class_of[perms]
+        orientations = twist_images[symmetry_of[perms], orientation_move[indices % 2187, m]]
+        neighbours = [classes * 2187 + orientations]
+        # Si la representante tiene simetrias propias, su clase ocupa varias entradas de la
+        # tabla (una por cada imagen de la orientacion) y hay que llenarlas todas
+        for s in range(1, len(twist_images)):
+            selected = stable[classes, s]
+            if selected.any():
+                neighbours.append(classes[selected] * 2187 + twist_images[s, orientations[selected]])
+        return np.concatenate(neighbours)
+
+
+class EdgePattern:
+    # Un grupo de aristas: posicion de cada una (12!/(12-k)!) por su volteo (2^k)
+    def __init__(self, name, edges):
+        self.name = name
+        self.edges = tuple(edges)
+        self.size = math.perm(12, len(self.edges)) << len(self.edges)
+
+    def index(self, cubies):
+        ep, eo = cubies[2], cubies[3]
+        positions = [ep.index(edge) for edge in self.edges]
+        flips = 0
+        for position in positions:
+            flips = 2 * flips + eo[position]
+        return (permutation_rank(positions, 12) << len(self.edges)) | flips
+
+    def move_tables(self, moves):
+        _require_numpy()
+        k = len(self.edges)
+        positions = np.array(list(permutations(range(12), k)), dtype=np.int64)
+        position_move = np.empty((len(positions), len(moves)), dtype=np.int64)
+        flip_move = np.empty((len(positions), len(moves)), dtype=np.int64)
+        weights = 1 << np.arange(k - 1, -1, -1)
+        for m, (_, _, move_ep, move_eo) in enumerate(cubie_moves(moves)):
+            # La arista que estaba en move_ep[i] pasa a la posicion i y cambia su volteo en move_eo[i]
+            target = np.empty(12, dtype=np.int64)
+            flip = np.empty(12, dtype=np.int64)
+            for i, source in enumerate(move_ep):
+                target[source] = i
+                flip[source] = move_eo[i]
+            position_move[:, m] = rank_rows(target[positions], 12)
+            flip_move[:, m] = flip[positions] @ weights
+        return position_move.astype(np.int32), flip_move.astype(np.int32)
+
+    def neighbours(self, tables, indices, m):
+        position_move, flip_move = tables
+        k = len(self.edges)
+        positions = indices >> k
+        return (position_move[positions, m] << k) | ((indices & ((1 << k) - 1)) ^ flip_move[positions, m])
+
+
+PATTERNS = {
+    'corners': CornerPattern(),
+    'corners_sym': SymmetricCornerPattern(),
+    'edges_a': EdgePattern('edges_a', range(0, 6)),
+    'edges_b': EdgePattern('edges_b', range(6, 12)),
+}
+
+
+def pattern_move_tables(pattern, metric='HTM', cache_dir=None):
+    # Las dos tablas se calculan juntas, solo si alguna falta en la cache
+    built = []
+
+    def build(i):
+        if not built:
+            built.extend(pattern.move_tables(METRICS[metric]))
+        return built[i]
+
+    return tuple(
+        cached_table(f"{pattern.name}-moves{i}-{metric}", lambda i=i: build(i), cache_dir)
+        for i in range(2)
+    )
+
+
+def build_distances(pattern, metric='HTM', chunk_size=1 << 21, cache_dir=None):
+    _require_numpy()
+    moves = METRICS[metric]
+    tables = pattern_move_tables(pattern, metric, cache_dir)
+    distances = np.full(pattern.size, UNSEEN, dtype=np.uint8)
+    distances[pattern.index(state_to_cubies(RubikCube().state))] = 0
+    depth = 0
+    while True:
+        # BFS por capas: la frontera son los indices a distancia depth
+        frontier = np.flatnonzero(distances == depth)
+        if len(frontier) == 0:
+            break
+        for start in range(0, len(frontier), chunk_size):
+            chunk = frontier[start:start + chunk_size]
+            for m in range(len(moves)):
+                neighbours = pattern.neighbours(tables, chunk, m)
+                neighbours = neighbours[distances[neighbours] == UNSEEN]
+                distances[neighbours] = depth + 1
+        depth += 1
+    return distances
+
+
+def pack_nibbles(distances):
+    # Dos distancias por byte: la de indice par en los 4 bits bajos
+    if len(distances) % 2:
+        distances = np.append(distances, np.uint8(0))
+    return (distances[0::2] | (distances[1::2] << 4)).tobytes()
+
+
+class PatternDatabase:
+    def __init__(self, pattern, metric, table):
+        self.pattern = pattern
+        self.metric = metric
+        self.table = table
+
+    def __call__(self, cube):
+        index = self.pattern.index(state_to_cubies(cube.state))
+        return (self.table[index >> 1] >> ((index & 1) << 2)) & 15
+
+    @classmethod
+    def build(cls, name, metric='HTM', cache_dir=None):
+        pattern = PATTERNS[name]
+        return cls(pattern, metric, pack_nibbles(build_distances(pattern, metric, cache_dir=cache_dir)))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        header = _HEADER.pack(PDB_MAGIC, PDB_VERSION, self.metric.encode(),
+                              self.pattern.name.encode(), self.pattern.size)
+        # Se escribe en un temporal (propio de este proceso, como en save_table) y se renombra
+        # para no dejar archivos a medias
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(header)
+            f.write(self.table)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        # El archivo se mapea en memoria: cargar es casi instantaneo y la tabla no se copia
+        data = map_file(path)
+        magic, version, metric, name, size = _HEADER.unpack_from(data)
+        if magic != PDB_MAGIC or version != PDB_VERSION:
+            raise ValueError(f"{path} is not a version {PDB_VERSION} pattern database")
+        pattern = PATTERNS[name.rstrip(b'\0').decode()]
+        table = memoryview(data)[_HEADER.size:]
+        if size != pattern.size or len(table) != (size + 1) // 2:
+            raise ValueError(f"{path} does not match the {pattern.name} pattern")
+        return cls(pattern, metric.rstrip(b'\0').decode(), table)
+
+
+def pattern_database_path(name, metric='HTM', cache_dir=None):
+    return os.path.join(cache_dir or default_cache_dir(), f"{name}-{metric}-v{PDB_VERSION}.pdb")
+
+
+def load_pattern_database(name, metric='HTM', cache_dir=None):
+    # Carga la base desde la cache; si no existe (o es de otra version) la construye y la guarda
+    path = pattern_database_path(name, metric, cache_dir)
+    if os.path.exists(path):
+        try:
+            return PatternDatabase.load(path)
+        except ValueError:
+            pass
+    PatternDatabase.build(name, metric, cache_dir).save(path)
+    return PatternDatabase.load(path)
+
+
+class PatternHeuristic:
+    # Heuristica admisible para solve_a_star y solve_ida_star: maximo de varias bases
+    def __init__(self, databases):
+        self.databases = list(databases)
+
+    def __call__(self, cube):
+        cubies = state_to_cubies(cube.state)
+        best = 0
+        for database in self.databases:
+            index = database.pattern.index(cubies)
+            best = max(best, (database.table[index >> 1] >> ((index & 1) << 2)) & 15)
+        return best
+
+
+def pattern_heuristic(metric='HTM', names=DEFAULT_PATTERNS, cache_dir=None):
+    return PatternHeuristic(load_pattern_database(name, metric, cache_dir) for name in names)
+
+
+if __name__ == '__main__':
+    for name in DEFAULT_PATTERNS:
+        path = pattern_database_path(name)
+        start_time = time.perf_counter()
+        load_pattern_database(name)
+        print(f"{name}: {time.perf_counter() - start_time:.1f} s, {os.path.getsize(path) / 2 ** 20:.1f} MiB ({path})")
@@ -0,0 +1,315 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from RubikBatch import ALGORITHMS, HEURISTIC_ALGORITHMS, HEURISTICS, scramble_to_state
+from RubikCompleto import METRICS, RubikCube, RubikSolver, SearchStats, canonical_state, rotate_moves
+
+# Servicio de resolucion: un servidor HTTP minimo sobre asyncio (TCP o socket Unix) que
+# recibe POST /solve con JSON y reparte el trabajo en un pool de procesos acotado.
+# - Las peticiones simultaneas por el mismo estado canonico (el mismo cubo girado o con
+#   otros colores, con el mismo algoritmo y opciones) comparten un solo calculo
+# - Cada peticion tiene su plazo; al vencer responde 504 aunque el calculo siga para otras
+# - Un calculo sin nadie esperandolo se cancela: si aun esta en cola no llega a empezar, y
+#   si esta en marcha la busqueda lo ve en su marca de cancelacion y se detiene
+#
+# Peticion: {"scramble": "R U F'", "algorithm": "Two-Phase", "heuristic": null,
+#            "metric": "HTM", "deadline": 10, "options": {}}
+# GET /stats devuelve los contadores del servicio.
+
+# Cada cuantos nodos expandidos mira la busqueda su marca de cancelacion
+CANCEL_CHECK_EVERY = 1000
+# Segundos del plazo reservados para el envio al trabajador y la vuelta del resultado
+DEADLINE_MARGIN = 0.1
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error',
+           503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+# Estado de cada proceso trabajador
+_cancel_flags = None
+_solvers = {}
+_pattern_heuristics = {}
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def _init_worker(flags):
+    global _cancel_flags
+    _cancel_flags = flags
+
+
+def _solve(slot, state, metric, algorithm, heuristic, options, expires=None):
+    # Se ejecuta en un trabajador. La marca del hueco slot se consulta a traves del
+    # progreso de SearchStats; si esta puesta, la busqueda se aborta con una excepcion.
+    # expires (segun time.time(), comun a todos los procesos) es cuando el resultado tiene
+    # que estar listo si la peticion no fija max_time
+    solver = _solvers.get(metric)
+    if solver is None:
+        solver = _solvers[metric] = RubikSolver(metric)
+    solver.cube = RubikCube(state)
+    args = ()
+    if heuristic == 'pattern':
+        if metric not in _pattern_heuristics:
+            from RubikPDB import pattern_heuristic
+            _pattern_heuristics[metric] = pattern_heuristic(metric)
+        args = (_pattern_heuristics[metric],)
+    elif heuristic is not None:
+        args = (getattr(solver, heuristic),)
+    if algorithm == "Two-Phase":
+        # Las tablas se cargan antes de medir el tiempo que queda
+        from RubikKociemba import default_two_phase_solver
+        default_two_phase_solver()
+    if expires is not None:
+        # Solo queda el plazo menos lo que el calculo espero en cola. Con 0, Two-Phase devuelve
+        # su primera solucion y las demas busquedas su mejor resultado parcial
+        options = dict(options, max_time=max(expires - time.time(), 0.0))
+
+    def check_cancelled(stats):
+        if _cancel_flags[slot]:
+            raise _Cancelled
+
+    start_time = time.perf_counter()
+    try:
+        result = getattr(solver, ALGORITHMS[algorithm])(
+            *args, stats=SearchStats(check_cancelled, CANCEL_CHECK_EVERY), **options)
+    except _Cancelled:
+        return {'status': 'cancelled', 'result': None, 'nodes': None, 'time': time.perf_counter() - start_time}
+    return {'status': solver.status, 'result': result, 'nodes': solver.nodes_expanded,
+            'time': time.perf_counter() - start_time}
+
+
+class RequestError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class _Computation:
+    __slots__ = ('future', 'slot', 'waiters')
+
+    def __init__(self, future, slot):
+        self.future = future
+        self.slot = slot
+        self.waiters = 0
+
+
+class SolveService:
+    def __init__(self, workers=None, max_pending=None, deadline=10.0):
+        self.workers = workers or os.cpu_count()
+        # Calculos en marcha o en cola; por encima el servicio responde 503
+        self.max_pending = max_pending or 4 * self.workers
+        self.deadline = deadline
+        # Trabajadores con spawn: con fork heredarian los sockets abiertos de los clientes y
+        # cerrar la conexion en el servidor no llegaria al cliente
+        context = multiprocessing.get_context('spawn')
+        self.flags = context.Array('b', self.max_pending, lock=False)
+        self.free_slots = list(range(self.max_pending))
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                            initargs=(self.flags,))
+        self.computations = {}
+        self.counters = {'requests': 0, 'computations': 0, 'coalesced': 0, 'completed': 0, 'deadline': 0,
+                         'abandoned': 0, 'cancelled': 0, 'rejected': 0, 'errors': 0}
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def parse(self, request):
+        # Valida la peticion y devuelve (estado, metrica, algoritmo, heuristica, opciones, plazo)
+        if not isinstance(request, dict):
+            raise RequestError(400, "the request body must be a JSON object")
+        algorithm = request.get('algorithm', "Two-Phase")
+        if algorithm not in ALGORITHMS:
+            raise RequestError(400, f"unknown algorithm {algorithm!r}, expected one of {sorted(ALGORITHMS)}")
+        metric = request.get('metric', 'HTM')
+        if metric not in METRICS:
+            raise RequestError(400, f"unknown metric {metric!r}, expected one of {sorted(METRICS)}")
+        heuristic = request.get('heuristic')
+        if algorithm in HEURISTIC_ALGORITHMS and heuristic not in HEURISTICS:
+            raise RequestError(400, f"{algorithm} needs a heuristic, one of {HEURISTICS}")
+        if algorithm not in HEURISTIC_ALGORITHMS:
+            heuristic = None
+        options = request.get('options', {})
+        if not isinstance(options, dict) or 'stats' in options:
+            raise RequestError(400, "options must be an object of solver keyword arguments")
+        deadline = request.get('deadline', self.deadline)
+        if not isinstance(deadline, (int, float)) or deadline <= 0:
+            raise RequestError(400, "deadline must be a positive number of seconds")
+        try:
+            state = scramble_to_state(request.get('scramble', ''))
+        except (TypeError, ValueError) as error:
+            raise RequestError(400, f"invalid scramble: {error}") from None
+        return state, metric, algorithm, heuristic, options, deadline
+
+    async def solve(self, request):
+        self.counters['requests'] += 1
+        state, metric, algorithm, heuristic, options, deadline = self.parse(request)
+        canonical, rotation = canonical_state(state)
+        key = (metric, algorithm, heuristic, json.dumps(options, sort_keys=True), canonical)
+        computation = self.computations.get(key)
+        shared = computation is not None
+        if shared:
+            self.counters['coalesced'] += 1
+        else:
+            computation = self._start(key, canonical, metric, algorithm, heuristic, options, deadline)
+        computation.waiters += 1
+        start_time = time.perf_counter()
+        try:
+            outcome = await asyncio.wait_for(asyncio.shield(computation.future), deadline)
+        except asyncio.TimeoutError:
+            self.counters['deadline'] += 1
+            raise RequestError(504, f"deadline of {deadline} s exceeded") from None
+        except asyncio.CancelledError:
+            self.counters['abandoned'] += 1
+            raise
+        except Exception as error:
+            self.counters['errors'] += 1
+            raise RequestError(500, f"{type(error).__name__}: {error}") from None
+        finally:
+            computation.waiters -= 1
+            if computation.waiters == 0 and not computation.future.done():
+                self._cancel(key, computation)
+        self.counters['completed'] += 1
+        result = outcome['result']
+        response = {'status': outcome['status'], 'nodes': outcome['nodes'], 'solve_time': outcome['time'],
+                    'time': time.perf_counter() - start_time, 'shared': shared}
+        if isinstance(result, list):
+            # El calculo se hizo en el marco canonico; se traduce al de esta peticion
+            response['solution'] = rotate_moves(result, rotation, inverse=True)
+        else:
+            response['solution'] = None
+            response['result'] = result
+        return response
+
+    def _start(self, key, canonical, metric, algorithm, heuristic, options, deadline):
+        if not self.free_slots:
+            self.counters['rejected'] += 1
+            raise RequestError(503, f"too many pending computations ({self.max_pending})")
+        slot = self.free_slots.pop()
+        self.flags[slot] = 0
+        # Sin max_time explicito, el calculo termina antes del plazo de la peticion que lo empezo
+        expires = None if 'max_time' in options else time.time() + deadline - DEADLINE_MARGIN
+        future = self.executor.submit(_solve, slot, canonical, metric, algorithm, heuristic, options, expires)
+        loop = asyncio.get_running_loop()
+        # El hueco queda ocupado hasta que el proceso termina de verdad, aunque la peticion
+        # ya no espere (el futuro de asyncio se da por cancelado en cuanto se pide)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.free_slots.append, slot))
+        computation = _Computation(asyncio.wrap_future(future), slot)
+        computation.future.add_done_callback(lambda _: self._forget(key, computation))
+        self.computations[key] = computation
+        self.counters['computations'] += 1
+        return computation
+
+    def _forget(self, key, computation):
+        if self.computations.get(key) is computation:
+            del self.computations[key]
+
+    def _cancel(self, key, computation):
+        self.counters['cancelled'] += 1
+        self._forget(key, computation)
+        self.flags[computation.slot] = 1
+        computation.future.cancel()
+
+    async def handle(self, reader, writer):
+        # Una peticion por conexion (Connection: close)
+        try:
+            try:
+                method, path, body = await _read_request(reader)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                await _respond(writer, 400, {'error': "malformed HTTP request"})
+                return
+            if path == '/stats':
+                if method != 'GET':
+                    await _respond(writer, 405, {'error': "use GET /stats"})
+                    return
+                await _respond(writer, 200, dict(self.counters, pending=len(self.computations)))
+                return
+            if path != '/solve':
+                await _respond(writer, 404, {'error': f"unknown path {path!r}"})
+                return
+            if method != 'POST':
+                await _respond(writer, 405, {'error': "use POST /solve"})
+                return
+            try:
+                request = json.loads(body)
+            except ValueError:
+                await _respond(writer, 400, {'error': "the request body is not valid JSON"})
+                return
+            # Si el cliente cierra la conexion antes de la respuesta, la peticion se abandona
+            solve = asyncio.ensure_future(self.solve(request))
+            closed = asyncio.ensure_future(reader.read(1))
+            await asyncio.wait({solve, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if not solve.done() and closed.exception() is None and closed.result():
+                # Bytes de mas despues de la peticion: no es un cierre, se sigue esperando
+                await asyncio.wait({solve})
+            if not solve.done():
+                solve.cancel()
+                await asyncio.gather(solve, return_exceptions=True)
+                return
+            closed.cancel()
+            try:
+                await _respond(writer, 200, solve.result())
+            except RequestError as error:
+                await _respond(writer, error.code, {'error': str(error)})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_request(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    method, path, _ = lines[0].split(' ', 2)
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    body = await reader.readexactly(length) if length else b''
+    return method, path, body
+
+
+async def _respond(writer, code, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {code} {REASONS[code]}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+
+
+async def serve(service, host='127.0.0.1', port=8080, unix=None):
+    # Arranca el servidor y devuelve el asyncio.Server (unix: ruta del socket en lugar de TCP)
+    if unix is not None:
+        return await asyncio.start_unix_server(service.handle, unix)
+    return await asyncio.start_server(service.handle, host, port)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Asyncio JSON solve service backed by a process pool")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', help="listen on this Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-pending', type=int, default=None)
+    parser.add_argument('--deadline', type=float, default=10.0, help="default per-request deadline, in seconds")
+    args = parser.parse_args()
+
+    async def main():
+        service = SolveService(args.workers, args.max_pending, args.deadline)
+        server = await serve(service, args.host, args.port, args.unix)
+        where = args.unix or f"http://{args.host}:{args.port}"
+        print(f"Serving on {where} with {service.workers} workers", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
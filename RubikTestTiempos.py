@@ -1,212 +1,165 @@
-import random
-import heapq
+import argparse
+import json
 import math
+import platform
+import random
+import subprocess
 import time
+import tracemalloc
+
+from rubik import ALGORITHMS, METRICS, RubikCube, RubikSolver, pattern_heuristic, pruned_successors
+
+# Con giros reales las busquedas sin informacion crecen como 18^d; por encima de
+# estas profundidades no terminan en un tiempo razonable
+MAX_SHUFFLE = {"BFS": 5, "Vectorized BFS": 5, "Best-First Search": 3, "A*": 5, "Bidirectional BFS": 10, "IDA*": 7}
+# Heuristicas de cada algoritmo informado; IDA* necesita una cota inferior admisible
+HEURISTICS = {
+    "Best-First Search": ['heuristic1', 'heuristic2', 'heuristic3'],
+    "A*": ['heuristic1', 'heuristic2', 'heuristic3'],
+    "Beam Search": ['heuristic4'],
+    "IDA*": ['heuristic4'],
+}
+OPTIONS = {"Two-Phase": {'max_time': 1.0}}
+
+
+def scramble_corpus(depth, runs, seed=0, metric='HTM'):
+    # Mezclas fijas para cada (semilla, metrica, profundidad). Se evitan giros que se anulan o
+    # se juntan con los anteriores (R R', R L R, en QTM R R R), asi que la profundidad es la que se pide
+    rng = random.Random(f"{seed}-{metric}-{depth}")
+    moves = METRICS[metric]
+    successors = pruned_successors(moves)
+    corpus = []
+    for _ in range(runs):
+        scramble = []
+        last = None
+        for _ in range(depth):
+            move_index, last = rng.choice(successors[last])
+            scramble.append(moves[move_index])
+        corpus.append(scramble)
+    return corpus
+
+
+def percentile(values, p):
+    # Percentil por rango mas cercano: siempre es uno de los valores medidos
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def measure(solver, solve, scramble, memory, *args, random_seed=None, **options):
+    # Resuelve la mezcla con solve(*args, **options) y devuelve (solucion, segundos, pico de
+    # memoria en bytes o None). El cubo se prepara fuera del intervalo medido. tracemalloc
+    # ralentiza la busqueda, asi que la memoria se mide en otra pasada; status y nodes_expanded
+    # quedan los de la pasada medida. Con random_seed, random se reinicia antes de cada pasada
+    start = RubikCube()
+    for move in scramble:
+        start.rotate(move)
+    solver.cube = start.copy()
+    if random_seed is not None:
+        random.seed(random_seed)
+    start_time = time.perf_counter()
+    solution = solve(*args, **options)
+    elapsed = time.perf_counter() - start_time
+    peak = None
+    if memory:
+        status, nodes_expanded = solver.status, solver.nodes_expanded
+        solver.cube = start.copy()
+        if random_seed is not None:
+            random.seed(random_seed)
+        tracemalloc.start()
+        solve(*args, **options)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        solver.status, solver.nodes_expanded = status, nodes_expanded
+    return solution, elapsed, peak
+
+
+def generate_algorithm_results(algorithm, solver, corpus, heuristic=None, seed=0, memory=True):
+    solve = getattr(solver, ALGORITHMS[algorithm])
+    args = (heuristic,) if heuristic is not None else ()
+    options = OPTIONS.get(algorithm, {})
+    # Una pasada sin medir carga las importaciones diferidas y las tablas
+    solver.cube = RubikCube()
+    solve(*args, **options)
+    times, nodes, lengths, peaks = [], [], [], []
+    for scramble in corpus:
+        # La semilla fija hace repetible el recocido
+        solution, elapsed, peak = measure(solver, solve, scramble, memory, *args, random_seed=seed, **options)
+        times.append(elapsed)
+        nodes.append(solver.nodes_expanded)
+        if isinstance(solution, list):
+            lengths.append(len(solution))
+        if peak is not None:
+            peaks.append(peak)
+
+    return {
+        'runs': len(times),
+        'mean_ms': sum(times) / len(times) * 1e3,
+        'p50_ms': percentile(times, 50) * 1e3,
+        'p95_ms': percentile(times, 95) * 1e3,
+        'p99_ms': percentile(times, 99) * 1e3,
+        'nodes_expanded': sum(nodes) / len(nodes),
+        'nodes_per_second': sum(nodes) / sum(times) if sum(times) else 0.0,
+        'peak_memory_bytes': max(peaks) if peaks else None,
+        'solution_length': sum(lengths) / len(lengths) if lengths else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
 
-class RubikCube:
-    def __init__(self):
-        self.faces = {
-            'F': [['R', 'R', 'R'], ['R', 'R', 'R'], ['R', 'R', 'R']],
-            'B': [['O', 'O', 'O'], ['O', 'O', 'O'], ['O', 'O', 'O']],
-            'U': [['W', 'W', 'W'], ['W', 'W', 'W'], ['W', 'W', 'W']],
-            'D': [['Y', 'Y', 'Y'], ['Y', 'Y', 'Y'], ['Y', 'Y', 'Y']],
-            'L': [['G', 'G', 'G'], ['G', 'G', 'G'], ['G', 'G', 'G']],
-            'R': [['B', 'B', 'B'], ['B', 'B', 'B'], ['B', 'B', 'B']]
-        }
-
-    def rotate_face(self, face):
-        face[:] = [list(row) for row in zip(*face[::-1])]
-
-    def rotate(self, move):
-        self.rotate_face(self.faces[move])
-
-    def print_cube(self):
-        for face in ['U', 'R', 'F', 'D', 'L', 'B']:
-            print(f"{face}:")
-            for row in self.faces[face]:
-                print(' '.join(row))
-            print()
-
-class RubikSolver:
-    def __init__(self):
-        self.cube = RubikCube()
-
-    def shuffle_cube(self, num_moves=20):
-        moves = ['F', 'B', 'U', 'D', 'L', 'R']
-        for _ in range(num_moves):
-            move = random.choice(moves)
-            self.cube.rotate(move)
-
-    def is_solved(self, cube):
-        for face in cube.faces:
-            if not all(color == cube.faces[face][0][0] for row in cube.faces[face] for color in row):
-                return False
-        return True
-
-    def copy_cube(self, cube):
-        new_cube = RubikCube()
-        new_cube.faces = {face: [row[:] for row in cube.faces[face]] for face in cube.faces}
-        return new_cube
-
-    def heuristic1(self, cube):
-        # Heurística 1: Cuenta el número de caras resueltas
-        solved_faces = sum(1 for face in cube.faces if all(cube.faces[face][0][0] == cell for row in cube.faces[face] for cell in row))
-        return -solved_faces
-
-    def heuristic2(self, cube):
-        # Heurística 2: Cuenta el número de colores únicos en las caras
-        unique_colors = len(set(color for face in cube.faces for row in cube.faces[face] for color in row))
-        return -unique_colors
-
-    def heuristic3(self, cube):
-        # Heurística 3: Cuenta el número de colores repetidos en las caras
-        repeated_colors = sum(1 for face in cube.faces for row in cube.faces[face] for color in row if row.count(color) > 1)
-        return -repeated_colors
-
-    def solve_bfs(self):
-        queue = []
-        seen = set()
-        queue.append((self.copy_cube(self.cube), []))
-
-        while queue:
-            current_cube, moves = queue.pop(0)
-            if self.is_solved(current_cube):
-                return moves
-            for move in ['F', 'B', 'U', 'D', 'L', 'R']:
-                new_cube = self.copy_cube(current_cube)
-                new_cube.rotate(move)
-                cube_state = str(new_cube.faces)
-                if cube_state not in seen:
-                    seen.add(cube_state)
-                    queue.append((new_cube, moves + [move]))
-
-    def solve_best_first_search(self, heuristic):
-        priority_queue = []
-        initial_state = (heuristic(self.cube), self.copy_cube(self.cube), [])
-        heapq.heappush(priority_queue, initial_state)
-        seen = set()
-
-        while priority_queue:
-            _, current_cube, moves = heapq.heappop(priority_queue)
-            if self.is_solved(current_cube):
-                return moves
-            for move in ['F', 'B', 'U', 'D', 'L', 'R']:
-                new_cube = self.copy_cube(current_cube)
-                new_cube.rotate(move)
-                cube_state = str(new_cube.faces)
-                if cube_state not in seen:
-                    seen.add(cube_state)
-                    heapq.heappush(priority_queue, (heuristic(new_cube), new_cube, moves + [move]))
-
-    def solve_a_star(self, heuristic):
-        open_set = []
-        initial_state = (heuristic(self.cube), 0, self.copy_cube(self.cube), [])
-        heapq.heappush(open_set, initial_state)
-        seen = set()
-
-        while open_set:
-            _, cost, current_cube, moves = heapq.heappop(open_set)
-            if self.is_solved(current_cube):
-                return moves
-            for move in ['F', 'B', 'U', 'D', 'L', 'R']:
-                new_cube = self.copy_cube(current_cube)
-                new_cube.rotate(move)
-                cube_state = str(new_cube.faces)
-                if cube_state not in seen:
-                    seen.add(cube_state)
-                    new_cost = cost + 1
-                    heapq.heappush(open_set, (heuristic(new_cube) + new_cost, new_cost, new_cube, moves + [move]))
-
-    def solve_simulated_annealing(self, temp=30, cooling_rate=0.99, stop_temp=0.1):
-        current_cube = self.copy_cube(self.cube)
-        current_energy = self.calculate_energy(current_cube)
-        best_cube = current_cube
-        best_energy = current_energy
-        
-        while temp > stop_temp:
-            next_cube = self.copy_cube(current_cube)
-            self.make_random_move(next_cube)
-            next_energy = self.calculate_energy(next_cube)
-            
-            if next_energy < current_energy:
-                current_cube, current_energy = next_cube, next_energy
-                if current_energy < best_energy:
-                    best_cube, best_energy = current_cube, current_energy
-            else:
-                if random.random() < math.exp((current_energy - next_energy) / temp):
-                    current_cube, current_energy = next_cube, next_energy
-            
-            temp *= cooling_rate
-        
-        self.cube = best_cube
-        return best_energy
-
-    def calculate_energy(self, cube):
-        energy = 0
-        for face in cube.faces:
-            target_color = cube.faces[face][0][0]
-            for row in cube.faces[face]:
-                for color in row:
-                    if color != target_color:
-                        energy += 1
-        return energy
-
-    def make_random_move(self, cube):
-        move = random.choice(['F', 'B', 'U', 'D', 'L', 'R'])
-        cube.rotate(move)
-
-def generate_algorithm_results(algorithm, solver, shuffle_max, heuristic=None):
-    times = []
-    for _ in range(20):
-        start_time = time.time()
-        solver.shuffle_cube(shuffle_max)
-
-        if algorithm == "BFS":
-            solver.solve_bfs()
-        elif algorithm == "Best-First Search":
-            solver.solve_best_first_search(heuristic)
-        elif algorithm == "A*":
-            solver.solve_a_star(heuristic)
-        elif algorithm == "Simulated Annealing":
-            solver.solve_simulated_annealing()
-        end_time = time.time()
-        times.append(end_time - start_time)
-
-    average_time = sum(times) / len(times)
-    min_time = min(times)
-    max_time = max(times)
-
-    return {'average_time': average_time, 'min_time': min_time, 'max_time': max_time}
 
 if __name__ == '__main__':
-    solver = RubikSolver()
-    algorithms = ["BFS", "Best-First Search", "A*", "Simulated Annealing"]
-    heuristics = [solver.heuristic1, solver.heuristic2, solver.heuristic3]
-    shuffle_max_values = [5, 10, 15, 20]
-    algorithm_results = {}
-
-    for algorithm in algorithms:
-        algorithm_results[algorithm] = {}
-        for shuffle_max in shuffle_max_values:
-            if algorithm == "Best-First Search" or algorithm == "A*":
-                for heuristic in heuristics:
-                    algorithm_results[algorithm][(shuffle_max, heuristic.__name__)] = generate_algorithm_results(algorithm, solver, shuffle_max, heuristic)
-            else:
-                algorithm_results[algorithm][shuffle_max] = generate_algorithm_results(algorithm, solver, shuffle_max)
-
-    for algorithm in algorithms:
-        print(f"Results for {algorithm}:")
-        if algorithm == "Best-First Search" or algorithm == "A*":
-            for shuffle_max, results in algorithm_results[algorithm].items():
-                print(f"Shuffle max: {shuffle_max[0]}, Heuristic: {shuffle_max[1]}")
-                print(f"Average time: {results['average_time']}")
-                print(f"Min time: {results['min_time']}")
-                print(f"Max time: {results['max_time']}")
-                print()  
-        else:
-            for shuffle_max, results in algorithm_results[algorithm].items():
-                print(f"Shuffle max: {shuffle_max}")
-                print(f"Average time: {results['average_time']}")
-                print(f"Min time: {results['min_time']}")
-                print(f"Max time: {results['max_time']}")
-                print()  
+    parser = argparse.ArgumentParser(description="Solver benchmark over fixed-seed scramble corpora")
+    parser.add_argument('--algorithms', nargs='+', choices=sorted(ALGORITHMS),
+                        default=["BFS", "Vectorized BFS", "Bidirectional BFS", "Best-First Search", "A*",
+                                 "Beam Search", "IDA*", "Two-Phase", "Simulated Annealing", "Batch Annealing"])
+    # La profundidad 3 esta para que Best-First Search (limitada a 3) tambien salga en el informe
+    parser.add_argument('--depths', nargs='+', type=int, default=[3, 5, 10, 15, 20])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--metric', choices=sorted(METRICS), default='HTM')
+    parser.add_argument('--pattern', action='store_true',
+                        help="also run A*, beam search and IDA* with the pattern databases")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--output', default='benchmark-results.json')
+    args = parser.parse_args()
+
+    solver = RubikSolver(args.metric)
+    results = []
+    for algorithm in args.algorithms:
+        heuristics = {name: getattr(solver, name) if name else None for name in HEURISTICS.get(algorithm, [None])}
+        if args.pattern and algorithm in ("A*", "Beam Search", "IDA*"):
+            heuristics['pattern'] = pattern_heuristic(args.metric)
+        skipped = [depth for depth in args.depths if depth > MAX_SHUFFLE.get(algorithm, depth)]
+        if skipped:
+            print(f"{algorithm}: skipping depths {', '.join(map(str, skipped))} "
+                  f"(limit {MAX_SHUFFLE[algorithm]})", flush=True)
+        for depth in args.depths:
+            if depth in skipped:
+                continue
+            corpus = scramble_corpus(depth, args.runs, args.seed, args.metric)
+            for name, heuristic in heuristics.items():
+                result = generate_algorithm_results(algorithm, solver, corpus, heuristic, args.seed,
+                                                    not args.no_memory)
+                results.append({'algorithm': algorithm, 'heuristic': name, 'depth': depth, **result})
+
+                label = f"{algorithm} ({name})" if name else algorithm
+                memory = f"{result['peak_memory_bytes'] / 2 ** 20:.1f} MiB" if result['peak_memory_bytes'] is not None else "-"
+                print(f"{label}, depth {depth}: p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, "
+                      f"p99 {result['p99_ms']:.2f} ms, {result['nodes_expanded']:,.0f} nodes "
+                      f"({result['nodes_per_second']:,.0f}/s), peak {memory}", flush=True)
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'metric': args.metric,
+        'seed': args.seed,
+        'runs': args.runs,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
@@ -0,0 +1,118 @@
+import time
+
+from RubikCompleto import METRICS, MOVE_TABLES, mismatches, validate_state
+from RubikPDB import _require_numpy
+
+# Recocido simulado por lotes: las cadenas son una matriz uint8 (una fila por cadena) y en
+# cada paso de temperatura se aplica un movimiento al azar a cada fila, se calculan todas
+# las energias y se decide la aceptacion de Metropolis con operaciones sobre arrays.
+
+# Centro de la cara de cada sticker. Los giros de cara no mueven los centros, asi que el
+# color correcto de cada sticker es el mismo en todas las cadenas durante toda la busqueda
+_CENTER_OF = [9 * (i // 9) + 4 for i in range(54)]
+# Movimiento rechazado en el registro de pasos
+_REJECTED = 255
+
+
+def moved_stickers(tables):
+    # Para cada movimiento, posiciones que cambian y de donde viene su sticker. Un giro de cara
+    # mueve 20 de los 54; se rellena con un centro (que no se mueve) si alguno mueve menos
+    np = _require_numpy()
+    moved = [np.flatnonzero(table != np.arange(54)) for table in tables]
+    width = max(len(positions) for positions in moved)
+    positions = np.full((len(tables), width), 4, dtype=np.intp)
+    for m, changed in enumerate(moved):
+        positions[m, :len(changed)] = changed
+    return positions, np.take_along_axis(tables, positions, axis=1)
+
+
+def batch_annealing(cube, metric='HTM', chains=1024, temp=30, cooling_rate=0.99, stop_temp=0.1, seed=0,
+                    stop_when_solved=True, stats=None, budget=None):
+    # Todas las cadenas parten de cube y comparten la temperatura, asi que terminan a la vez:
+    # al enfriarse, en cuanto alguna llega a energia 0 (stop_when_solved) o al agotar el
+    # presupuesto, que cuenta un paso por cadena. Devuelve, por cadena, el estado de menor
+    # energia que visito (filas de una matriz (chains, 54)), su energia y los movimientos
+    # aceptados que llevan de cube a el, ademas del numero de pasos dados
+    np = _require_numpy()
+    validate_state(cube.state)
+    moves = METRICS[metric]
+    rng = np.random.default_rng(seed)
+    tables = np.array([MOVE_TABLES[move] for move in moves], dtype=np.intp)
+    positions, sources = moved_stickers(tables)
+    start = np.frombuffer(cube.state, dtype=np.uint8)
+    # Color correcto de cada posicion que cambia con cada movimiento
+    targets = start[_CENTER_OF][positions]
+    states = np.tile(start, (chains, 1))
+    flat = states.ravel()
+    # Con el desplazamiento de cada fila, un solo indexado sobre la matriz aplanada aplica a
+    # cada cadena su propio movimiento. Solo se leen y escriben los stickers que se mueven, y
+    # la energia del vecino es la actual mas la diferencia en esas posiciones
+    offsets = np.arange(chains, dtype=np.intp)[:, None] * 54
+    # Se reutilizan en cada paso: reservar memoria nueva para los indices cuesta mas que usarlos
+    destinations = np.empty((chains, positions.shape[1]), dtype=np.intp)
+    origins = np.empty_like(destinations)
+    energies = np.full(chains, mismatches(cube.state), dtype=np.int64)
+    best_states = states.copy()
+    best_energies = energies.copy()
+    # Pasos dados hasta el mejor estado de cada cadena, para recortar su recorrido
+    best_steps = np.zeros(chains, dtype=np.int64)
+    taken = []
+    step = 0
+    while temp > stop_temp:
+        if budget is not None and budget.exceeded(step * chains):
+            break
+        if stop_when_solved and not best_energies.all():
+            break
+        move_index = rng.integers(len(moves), size=chains)
+        np.add(np.take(positions, move_index, axis=0), offsets, out=destinations)
+        np.add(np.take(sources, move_index, axis=0), offsets, out=origins)
+        moved = flat[origins]
+        target = np.take(targets, move_index, axis=0)
+        next_energies = (energies + np.count_nonzero(moved != target, axis=1)
+                         - np.count_nonzero(flat[destinations] != target, axis=1))
+        # Metropolis: si no empeora se acepta siempre (exp(0) = 1)
+        accept = rng.random(chains) < np.exp(np.minimum(energies - next_energies, 0) / temp)
+        flat[destinations[accept]] = moved[accept]
+        energies[accept] = next_energies[accept]
+        taken.append(np.where(accept, move_index, _REJECTED).astype(np.uint8))
+        step += 1
+        improved = energies < best_energies
+        if improved.any():
+            best_states[improved] = states[improved]
+            best_energies[improved] = energies[improved]
+            best_steps[improved] = step
+        if stats is not None:
+            stats.expand(step, chains, count=chains)
+        temp *= cooling_rate
+
+    names = np.array(moves)
+    history = np.array(taken, dtype=np.uint8).reshape(step, chains)
+    traces = []
+    for chain in range(chains):
+        column = history[:best_steps[chain], chain]
+        traces.append(names[column[column != _REJECTED]].tolist())
+    return best_states, best_energies, traces, step
+
+
+if __name__ == '__main__':
+    import random
+    from RubikCompleto import RubikSolver
+    random.seed(0)
+    solver = RubikSolver()
+    solver.shuffle_cube(20)
+    scrambled = solver.cube.copy()
+    start_time = time.perf_counter()
+    solver.solve_simulated_annealing(rng=random.Random(0))
+    elapsed = time.perf_counter() - start_time
+    print(f"solve_simulated_annealing: {solver.nodes_expanded / elapsed:,.0f} chain-steps/s")
+    for chains in (1, 64, 1024, 16384, 65536):
+        start_time = time.perf_counter()
+        best_states, best_energies, traces, steps = batch_annealing(scrambled, chains=chains, stop_when_solved=False)
+        elapsed = time.perf_counter() - start_time
+        best = int(best_energies.argmin())
+        replay = scrambled.copy()
+        for move in traces[best]:
+            replay.rotate(move)
+        assert replay.state == best_states[best].tobytes()
+        print(f"{chains:,} chains: {steps} steps in {elapsed:.2f} s ({chains * steps / elapsed:,.0f} chain-steps/s), "
+              f"best energy {best_energies[best]}, mean best energy {best_energies.mean():.1f}")
@@ -0,0 +1,197 @@
+import time
+
+from RubikCompleto import (CORNER_FACELETS, EDGE_FACELETS, METRICS, MOVE_TABLES, SYMMETRY_TABLES, RubikCube,
+                           solved_target, symmetric_solution, symmetry_relabels, validate_state)
+from RubikPDB import _require_numpy
+
+# BFS por niveles: toda la frontera es una matriz uint8 (una fila por estado) y cada
+# movimiento se aplica a todas las filas con un solo indexado. Los duplicados se quitan
+# con claves empaquetadas ordenadas (np.unique / np.searchsorted) en lugar de un set.
+
+# En un cubo valido dos stickers de cada pieza la identifican junto con su orientacion:
+# 8 esquinas y 12 aristas son 40 stickers de 3 bits, que caben en dos enteros de 64 bits
+_KEY_STICKERS = [i for corner in CORNER_FACELETS for i in corner[:2]] + [i for edge in EDGE_FACELETS for i in edge]
+
+
+def pack_keys(stickers):
+    # (n, 40) colores -> n claves de 16 bytes que se ordenan como los enteros (hi, lo)
+    np = _require_numpy()
+    keys = np.zeros((len(stickers), 2), dtype=np.uint64)
+    for half in range(2):
+        for k in range(20):
+            keys[:, half] |= stickers[:, 20 * half + k].astype(np.uint64) << np.uint64(3 * k)
+    return keys.astype('>u8').view('V16').ravel()
+
+
+def _pack_nibbles(stickers):
+    # Dos stickers por byte; con 8 o 40 stickers por fila se compara como enteros de 32 bits
+    np = _require_numpy()
+    return np.ascontiguousarray((stickers[..., 0::2] << 4) | stickers[..., 1::2]).view('>u4')
+
+
+def symmetry_images(rows, relabels):
+    # (n, 54) -> (n, 48 * 54): cada fila vista a traves de las 48 simetrias, con los colores
+    # ya renombrados. Se construye una vez por estado y la comparten todos sus movimientos
+    return relabels[:, rows].transpose(1, 0, 2).reshape(len(rows), -1)
+
+
+def symmetry_gathers(tables):
+    # Por tabla de movimiento y simetria: columna de symmetry_images de la que sale cada
+    # sticker de la clave del hijo
+    np = _require_numpy()
+    symmetries = np.array(SYMMETRY_TABLES, dtype=np.intp)[:, _KEY_STICKERS]
+    offsets = 54 * np.arange(len(SYMMETRY_TABLES))[:, None]
+    return np.stack([table[symmetries] + offsets for table in tables])
+
+
+def symmetry_keys(images, gather):
+    # La menor de las 48 imagenes de cada hijo (la misma para toda su clase de simetria).
+    # Primero se comparan 8 stickers y solo las filas que empatan se comparan enteras
+    np = _require_numpy()
+    n, count = len(images), len(gather)
+    rows = np.arange(n)
+    prefixes = _pack_nibbles(images[:, gather[:, :8].ravel()].reshape(n, count, 8))[..., 0]
+    best = prefixes.argmin(axis=1)
+    keys = _pack_nibbles(images[rows[:, None], gather[best]])
+    ties = np.flatnonzero((prefixes == prefixes[rows, best][:, None]).sum(axis=1) > 1)
+    if len(ties):
+        candidates = _pack_nibbles(images[ties][:, gather.ravel()].reshape(len(ties), count, -1)).astype(np.uint32)
+        lowest = np.ones((len(ties), count), dtype=bool)
+        for column in range(candidates.shape[2]):
+            values = np.where(lowest, candidates[..., column], np.uint32(0xFFFFFFFF))
+            lowest &= values == values.min(axis=1)[:, None]
+        keys[ties] = candidates[np.arange(len(ties)), lowest.argmax(axis=1)]
+    return keys.view('V20').ravel()
+
+
+def _contains(sorted_keys, keys):
+    np = _require_numpy()
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[positions] == keys
+
+
+def _path(levels, node, moves):
+    path = []
+    for parent, move_index in reversed(levels):
+        path.append(moves[move_index[node]])
+        node = parent[node]
+    path.reverse()
+    return path
+
+
+def solve_vectorized_bfs(cube, metric='HTM', max_depth=None, chunk_size=1 << 16, level_sizes=None, stats=None,
+                         budget=None, symmetry=False):
+    # Todos los movimientos tienen su inverso en la metrica, asi que los vecinos de un estado
+    # del nivel d estan en los niveles d - 1, d o d + 1: basta con recordar los dos ultimos.
+    # Los limites del presupuesto se comprueban antes de expandir cada nivel; el resultado
+    # parcial es el camino al estado del nivel actual con menos stickers mal colocados.
+    # Con symmetry=True los niveles son clases de simetria y la busqueda va del resuelto al
+    # cubo inicial, como RubikSolver._symmetric_bfs (sin resultado parcial)
+    np = _require_numpy()
+    validate_state(cube.state)
+    goal = solved_target(cube.state)[0]
+    if cube.state == goal:
+        return []
+    moves = METRICS[metric]
+    tables = np.array([MOVE_TABLES[move] for move in moves], dtype=np.intp)
+    if symmetry:
+        relabels = np.array([np.frombuffer(relabel, dtype=np.uint8)[:6] for relabel in symmetry_relabels(cube.state)])
+        gathers = symmetry_gathers(tables)
+        identity = symmetry_gathers(np.arange(54)[None, :])[0]
+        # Las imagenes ocupan 48 veces mas que las filas
+        chunk_size = min(chunk_size, 1 << 13)
+
+        def child_keys(rows):
+            images = symmetry_images(rows, relabels)
+            return [symmetry_keys(images, gather) for gather in gathers]
+
+        def state_keys(rows):
+            return symmetry_keys(symmetry_images(rows, relabels), identity)
+
+        root, target = goal, cube.state
+    else:
+        key_tables = tables[:, _KEY_STICKERS]
+
+        def child_keys(rows):
+            return [pack_keys(rows[:, key_table]) for key_table in key_tables]
+
+        def state_keys(rows):
+            return pack_keys(rows[:, _KEY_STICKERS])
+
+        root, target = cube.state, goal
+    target_row = np.frombuffer(target, dtype=np.uint8)
+    target_key = state_keys(target_row[None, :])
+
+    frontier = np.frombuffer(root, dtype=np.uint8)[None, :]
+    frontier_keys = state_keys(frontier)
+    previous_keys = frontier_keys[:0]
+    # Por nivel: indice del padre en el nivel anterior y movimiento que lleva a cada estado
+    levels = []
+    expanded = 0
+    while max_depth is None or len(levels) < max_depth:
+        if budget is not None:
+            if budget.exceeded(expanded + len(frontier), len(frontier_keys) + len(previous_keys)):
+                if symmetry:
+                    return None
+                return _path(levels, int(np.argmin((frontier != target_row).sum(axis=1))), moves)
+            expanded += len(frontier)
+        if stats is not None:
+            stats.expand(len(levels) + 1, len(frontier), count=len(frontier))
+        candidates, parents, move_indices = [], [], []
+        for start in range(0, len(frontier), chunk_size):
+            rows = frontier[start:start + chunk_size]
+            keys = np.concatenate(child_keys(rows))
+            keys, first = np.unique(keys, return_index=True)
+            new = ~(_contains(frontier_keys, keys) | _contains(previous_keys, keys))
+            candidates.append(keys[new])
+            move_index, parent = np.divmod(first[new], len(rows))
+            # Hasta juntar el nivel se guardan con el tipo mas pequeno que les sirve
+            parents.append((parent + start).astype(np.int32))
+            move_indices.append(move_index.astype(np.uint8))
+        # Los trozos se deduplican entre si al juntar el nivel
+        keys, first = np.unique(np.concatenate(candidates), return_index=True)
+        if stats is not None:
+            stats.duplicates += len(frontier) * len(moves) - len(keys)
+        if len(keys) == 0:
+            return None
+        parent = np.concatenate(parents)[first]
+        move_index = np.concatenate(move_indices)[first]
+        levels.append((parent, move_index))
+        if level_sizes is not None:
+            level_sizes.append(len(keys))
+
+        node = np.searchsorted(keys, target_key)[0]
+        if node < len(keys) and keys[node] == target_key[0]:
+            path = _path(levels, node, moves)
+            if not symmetry:
+                return path
+            image = RubikCube(root)
+            for move in path:
+                image.rotate(move)
+            return symmetric_solution(cube.state, image.state, path)
+
+        # Solo ahora se construyen las filas del nuevo nivel, un movimiento cada vez
+        next_frontier = np.empty((len(keys), 54), dtype=np.uint8)
+        for m, table in enumerate(tables):
+            selected = np.flatnonzero(move_index == m)
+            next_frontier[selected] = frontier[parent[selected]][:, table]
+        frontier, previous_keys, frontier_keys = next_frontier, frontier_keys, keys
+    return None
+
+
+if __name__ == '__main__':
+    import random
+    from RubikCompleto import RubikSolver
+    random.seed(0)
+    solver = RubikSolver()
+    for depth in range(1, 7):
+        solver.cube = RubikCube()
+        solver.shuffle_cube(depth)
+        counts = []
+        start_time = time.perf_counter()
+        solution = solve_vectorized_bfs(solver.cube, level_sizes=counts)
+        elapsed = time.perf_counter() - start_time
+        print(f"Shuffle {depth}: {len(solution)} moves, {sum(counts):,} states in {elapsed:.2f} s "
+              f"({sum(counts) / elapsed:,.0f} states/s)")
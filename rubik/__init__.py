@@ -0,0 +1,45 @@
+import importlib
+
+# Paquete unico para importar el solucionador: los scripts, los benchmarks y los codigos
+# separados usan estas clases y funciones, asi que lo que se mide es lo que se entrega.
+# Cada nombre se importa de su modulo la primera vez que se usa (PEP 562): "import rubik"
+# no carga NumPy, las tablas de dos fases ni el pool de procesos si no hacen falta.
+
+_EXPORTS = {
+    'RubikCompleto': [
+        'COLORS', 'FACE_ORDER', 'INVERSE_MOVES', 'METRICS', 'MOVES_HTM', 'MOVES_QTM', 'MOVE_TABLES',
+        'OPPOSITE_FACES', 'ROTATION_TABLES', 'SOLVED_STATE', 'SOLVED', 'EXHAUSTED', 'TIME_LIMIT', 'NODE_LIMIT',
+        'VISITED_LIMIT', 'SYMMETRY_MOVES', 'SYMMETRY_TABLES', 'AdaptiveCooling', 'BucketQueue', 'GeometricCooling',
+        'HeapQueue', 'NodeArena', 'ReheatingCooling', 'RubikCube', 'RubikSolver', 'SearchBudget', 'SearchStats',
+        'canonical_state', 'faces_to_state', 'mismatches', 'pruned_successors', 'rotate_moves', 'search_budget',
+        'solved_target', 'state_to_cubies', 'state_to_faces', 'symmetric_solution', 'symmetry_reducer',
+        'symmetry_relabels', 'validate_state',
+    ],
+    'RubikPDB': [
+        'DEFAULT_PATTERNS', 'PATTERNS', 'SYMMETRIC_PATTERNS', 'PatternDatabase', 'PatternHeuristic', 'cached_table',
+        'default_cache_dir', 'load_pattern_database', 'pattern_database_path', 'pattern_heuristic',
+    ],
+    'RubikKociemba': ['TwoPhaseSolver', 'default_two_phase_solver'],
+    'RubikVectorBFS': ['solve_vectorized_bfs'],
+    'RubikVectorAnnealing': ['batch_annealing'],
+    'RubikCache': ['SolutionCache'],
+    'RubikBatch': ['ALGORITHMS', 'INVALID', 'parallel_annealing', 'scramble_to_state', 'solve_batch'],
+    'RubikServicio': ['SolveService', 'serve'],
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # Las siguientes consultas ya no pasan por __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))